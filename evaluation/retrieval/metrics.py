@@ -13,6 +13,8 @@ from dataclasses import dataclass, field
 from typing import Optional
 import math
 
+import numpy as np
+
 
 @dataclass
 class RetrievalMetrics:
@@ -41,6 +43,29 @@ class RetrievalMetrics:
         }
 
 
+def _scan(retrieved: list[str], expected_set: set[str], k: int) -> tuple[list[str], int]:
+    """
+    Single pass over the top-k results shared by all metrics.
+
+    Returns:
+        Relevant items among the top-k (in rank order) and the index of
+        the first one (-1 if there is none)
+    """
+    hits = []
+    first = -1
+    for i, item in enumerate(retrieved[:k]):
+        if item in expected_set:
+            if first < 0:
+                first = i
+            hits.append(item)
+    return hits, first
+
+
+def _f1(p: float, r: float) -> float:
+    """Harmonic mean of already computed precision and recall."""
+    return 0.0 if p + r == 0 else 2 * (p * r) / (p + r)
+
+
 def recall_at_k(retrieved: list[str], expected: list[str], k: int) -> float:
     """
     Calculate Recall@K
@@ -57,11 +82,13 @@ def recall_at_k(retrieved: list[str], expected: list[str], k: int) -> float:
     if not expected:
         return 1.0  
     
-    retrieved_k = set(retrieved[:k])
-    expected_set = set(expected)
+    # Single relevant item: a list membership test, no sets needed
+    if len(expected) == 1:
+        return 1.0 if expected[0] in retrieved[:k] else 0.0
     
-    hits = len(retrieved_k & expected_set)
-    return hits / len(expected_set)
+    expected_set = set(expected)
+    hits, _ = _scan(retrieved, expected_set, k)
+    return len(set(hits)) / len(expected_set)
 
 
 def precision_at_k(retrieved: list[str], expected: list[str], k: int) -> float:
@@ -77,18 +104,19 @@ def precision_at_k(retrieved: list[str], expected: list[str], k: int) -> float:
     Returns:
         Float between 0 and 1
     """
-    retrieved_k = retrieved[:k]
+    num_retrieved = min(len(retrieved), k)
     
-    if not retrieved_k:
+    if not num_retrieved:
         return 0.0
     
-    expected_set = set(expected)
-    hits = sum(1 for r in retrieved_k if r in expected_set)
+    if len(expected) == 1:
+        return retrieved[:k].count(expected[0]) / num_retrieved
     
-    return hits / len(retrieved_k)
+    hits, _ = _scan(retrieved, set(expected), k)
+    return len(hits) / num_retrieved
 
 
-def mrr(retrieved: list[str], expected: list[str]) -> float:
+def mrr(retrieved: list[str], expected: list[str], k: Optional[int] = None) -> float:
     """
     Calculate Mean Reciprocal Rank.
     1 / (position of first relevant result)
@@ -96,17 +124,19 @@ def mrr(retrieved: list[str], expected: list[str]) -> float:
     Args:
         retrieved: List of retrieved chunk IDs (in order)
         expected: List of relevant chunk IDs (ground truth)
+        k: Only consider the top-k results (MRR@K); all results if None
         
     Returns:
         Float between 0 and 1 (1 = first result was relevant)
     """
     expected_set = set(expected)
+    if k is not None:
+        retrieved = retrieved[:k]
     
-    for i, item in enumerate(retrieved):
-        if item in expected_set:
-            return 1.0 / (i + 1)
-    
-    return 0.0
+    return next(
+        (1.0 / (i + 1) for i, item in enumerate(retrieved) if item in expected_set),
+        0.0,
+    )
 
 def f1_at_k(retrieved: list[str], expected: list[str], k: int) -> float:
     """
@@ -121,19 +151,21 @@ def f1_at_k(retrieved: list[str], expected: list[str], k: int) -> float:
     Returns:
         Float between 0 and 1
     """
-    p = precision_at_k(retrieved, expected, k)
-    r = recall_at_k(retrieved, expected, k)
+    expected_set = set(expected)
+    hits, _ = _scan(retrieved, expected_set, k)
+    num_retrieved = min(len(retrieved), k)
     
-    if p + r == 0:
-        return 0.0
+    p = len(hits) / num_retrieved if num_retrieved else 0.0
+    r = len(set(hits)) / len(expected_set) if expected_set else 1.0
     
-    return 2 * (p * r) / (p + r)
+    return _f1(p, r)
 
 
 def evaluate_single_query(
     retrieved: list[str], 
     expected: list[str], 
-    k: int = 5
+    k: int = 5,
+    expected_set: Optional[frozenset[str]] = None,
 ) -> RetrievalMetrics:
     """
     Evaluate a single query with all metrics.
@@ -142,18 +174,27 @@ def evaluate_single_query(
         retrieved: List of retrieved chunk IDs (in order)
         expected: List of relevant chunk IDs (ground truth)
         k: Number of results to consider
+        expected_set: Precomputed set(expected), built here if None
         
     Returns:
         RetrievalMetrics object with all scores
+
+    All four metrics are derived from one scan of the top-k results, so
+    MRR here is MRR@K (a first hit beyond rank k scores 0).
     """
-    expected_set = set(expected)
-    hits = [r for r in retrieved[:k] if r in expected_set]
+    if expected_set is None:
+        expected_set = set(expected)
+    hits, first = _scan(retrieved, expected_set, k)
+    num_retrieved = min(len(retrieved), k)
+    
+    p = len(hits) / num_retrieved if num_retrieved else 0.0
+    r = len(set(hits)) / len(expected_set) if expected_set else 1.0
     
     return RetrievalMetrics(
-        recall_at_k=recall_at_k(retrieved, expected, k),
-        precision_at_k=precision_at_k(retrieved, expected, k),
-        mrr=mrr(retrieved, expected),
-        f1_at_k=f1_at_k(retrieved, expected, k),
+        recall_at_k=r,
+        precision_at_k=p,
+        mrr=1.0 / (first + 1) if first >= 0 else 0.0,
+        f1_at_k=_f1(p, r),
         k=k,
         retrieved=retrieved[:k],
         expected=expected,
@@ -176,11 +217,23 @@ def aggregate_metrics(metrics_list: list[RetrievalMetrics]) -> dict:
     
     n = len(metrics_list)
     
+    # (n, 4) matrix of scores -> one column-wise mean
+    scores = np.fromiter(
+        (
+            v
+            for m in metrics_list
+            for v in (m.recall_at_k, m.precision_at_k, m.mrr, m.f1_at_k)
+        ),
+        dtype=np.float64,
+        count=4 * n,
+    ).reshape(n, 4)
+    avg_recall, avg_precision, avg_mrr, avg_f1 = scores.mean(axis=0).tolist()
+    
     return {
-        "avg_recall_at_k": sum(m.recall_at_k for m in metrics_list) / n,
-        "avg_precision_at_k": sum(m.precision_at_k for m in metrics_list) / n,
-        "avg_mrr": sum(m.mrr for m in metrics_list) / n,
-        "avg_f1_at_k": sum(m.f1_at_k for m in metrics_list) / n,
+        "avg_recall_at_k": avg_recall,
+        "avg_precision_at_k": avg_precision,
+        "avg_mrr": avg_mrr,
+        "avg_f1_at_k": avg_f1,
         "num_queries": n,
         "k": metrics_list[0].k,
     }
\ No newline at end of file
@@ -1,15 +1,21 @@
 from pathlib import Path
 from typing import Callable
-import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
+import multiprocessing
+import os
 from datetime import datetime
 
+import numpy as np
+import orjson
 from rich.console import Console
 from rich.table import Table
 
-from dataclasses import asdict
-
 from evaluation.retrieval.metrics import evaluate_single_query, aggregate_metrics
 from evaluation.retrieval.test_cases import RETRIEVAL_QUERIES
+import codecompass.indexing.store as store_module
+from codecompass.config import settings
+from codecompass.llm.ollama import embed, embed_batch
 from codecompass.retrieval.search import (
         baseline_search, hyde_search, 
         query_expansion_search, query_expansion_search_context, SearchResult,
@@ -27,19 +33,58 @@ STRATEGIES = [
     # ("Context v3", query_expansion_context_v3)
 ]
 
+# Concurrent searches per strategy (each is LanceDB + Ollama I/O)
+EVAL_WORKERS = int(os.environ.get("CODECOMPASS_EVAL_WORKERS", "8"))
+# Strategies evaluated in parallel, one process each
+STRATEGY_WORKERS = int(os.environ.get("CODECOMPASS_EVAL_STRATEGY_WORKERS", len(STRATEGIES)))
+
+
+# Query embeddings computed once in the parent and handed to every worker
+_PRECOMPUTED: dict[str, np.ndarray] = {}
+
+
+@lru_cache(maxsize=1024)
+def _embed_cached(model: str, text: str) -> np.ndarray:
+    vector = _PRECOMPUTED.get(text)
+    return vector if vector is not None else embed(text)
+
+
+def _cached_embed(text: str) -> np.ndarray:
+    return _embed_cached(settings.embedding_model, text)
+
 
-def eval_strategy(repo_path: Path, search_fn: Callable, limit: int = 5):
+def _install_embed_cache(precomputed: dict[str, np.ndarray] = None):
+    """Route CodeStore query embeddings through an in-process LRU cache."""
+    _PRECOMPUTED.update(precomputed or {})
+    store_module.embed = _cached_embed
+
+
+def precompute_query_embeddings(queries: list[str]) -> dict[str, np.ndarray]:
+    """Embed the raw test queries in one batch, shared by all strategies."""
+    return dict(zip(queries, embed_batch(queries)))
+
+
+def eval_strategy(repo_path: Path, search_fn: Callable, limit: int = 5, detail: bool = False):
         all_metrics = []
         per_query = []
-        for q in RETRIEVAL_QUERIES:
-            retrieved = search_fn(repo_path, q.query, limit) 
+        with ThreadPoolExecutor(max_workers=EVAL_WORKERS) as executor:
+            futures = [
+                executor.submit(search_fn, repo_path, q.query, limit)
+                for q in RETRIEVAL_QUERIES
+            ]
+        for q, future in zip(RETRIEVAL_QUERIES, futures):
+            retrieved = future.result()
             if retrieved and isinstance(retrieved[0], SearchResult):
                 retrieved = [r.id for r in retrieved]
-            metrics = evaluate_single_query(retrieved, q.expected, k=limit)
+            metrics = evaluate_single_query(
+                retrieved, q.expected, k=limit, expected_set=q.expected_set
+            )
             all_metrics.append(metrics)
+            # Scores + counts by default; detail keeps the retrieved/expected/hit ID lists.
+            # vars() is a shallow view, orjson encodes the lists as-is (no asdict deep copy)
             per_query.append({
                   "query": q.query,
-                  **asdict(metrics)
+                  **(vars(metrics) if detail else metrics.to_dict())
             })
         agg =  aggregate_metrics(all_metrics)
         return {
@@ -47,20 +92,37 @@ def eval_strategy(repo_path: Path, search_fn: Callable, limit: int = 5):
               **agg
         }
         
-def eval_all(repo_path: Path, limit: int = 5) -> dict:
+def eval_all(repo_path: Path, limit: int = 5, detail: bool = False) -> dict:
     results = {}
-    
-    for name, fn in STRATEGIES:
-        console.print(f"\n[cyan]Evaluating: {name}[/cyan]")
-        results[name] = eval_strategy(repo_path, fn, limit)
+    # Every strategy that searches the unmodified query reuses these
+    precomputed = precompute_query_embeddings([q.query for q in RETRIEVAL_QUERIES])
+    
+    # spawn: workers must not inherit the parent's open Ollama/LanceDB connections
+    with ProcessPoolExecutor(
+        max_workers=STRATEGY_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_install_embed_cache,
+        initargs=(precomputed,),
+    ) as executor:
+        futures = {
+            executor.submit(eval_strategy, repo_path, fn, limit, detail): name
+            for name, fn in STRATEGIES
+        }
+        console.print(f"\n[cyan]Evaluating: {', '.join(futures.values())}[/cyan]")
         
-        # Quick summary
-        r = results[name]
-        console.print(f"  Recall@{limit}: {r['avg_recall_at_k']:.3f}")
-        console.print(f"  Precision@{limit}: {r['avg_precision_at_k']:.3f}")
-        console.print(f"  MRR: {r['avg_mrr']:.3f}")
-    
-    return results
+        for future in as_completed(futures):
+            name = futures[future]
+            results[name] = future.result()
+            
+            # Quick summary
+            r = results[name]
+            console.print(f"\n[cyan]Done: {name}[/cyan]")
+            console.print(f"  Recall@{limit}: {r['avg_recall_at_k']:.3f}")
+            console.print(f"  Precision@{limit}: {r['avg_precision_at_k']:.3f}")
+            console.print(f"  MRR: {r['avg_mrr']:.3f}")
+    
+    # Keep STRATEGIES order regardless of completion order
+    return {name: results[name] for name, _ in STRATEGIES}
 
 def print_summary(results: dict, k: int):
     """Print comparison table."""
@@ -71,10 +133,10 @@ def print_summary(results: dict, k: int):
     table.add_column("Precision@K", justify="right")
     table.add_column("MRR", justify="right")
     
-    # Sort by recall
-    sorted_results = sorted(results.items(), key=lambda x: x[1]["avg_recall_at_k"], reverse=True)
+    # Sort by recall; the sort is stable, so ties keep STRATEGIES order
+    ranked = sorted(results.items(), key=lambda item: item[1]["avg_recall_at_k"], reverse=True)
     
-    for i, (name, r) in enumerate(sorted_results):
+    for i, (name, r) in enumerate(ranked):
         style = "bold green" if i == 0 else ""
         table.add_row(
             name,
@@ -88,7 +150,7 @@ def print_summary(results: dict, k: int):
     
     # Print improvement over baseline
     baseline = results.get("Baseline", {})
-    best_name, best = sorted_results[0]
+    best_name, best = ranked[0]
     
     if baseline and best_name != "Baseline":
         baseline_recall = baseline.get("avg_recall_at_k", 0.001)
@@ -101,7 +163,11 @@ def main():
     """CLI entry point."""
     import sys
     
-    repo_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(".")
+    # --detail: keep per-query ID lists in the saved JSON (local debugging)
+    args = [a for a in sys.argv[1:] if a != "--detail"]
+    detail = len(args) != len(sys.argv) - 1
+    
+    repo_path = Path(args[0]) if args else Path(".")
     repo_path = repo_path.resolve()
     k = 5
     
@@ -111,7 +177,7 @@ def main():
     console.print(f"K: {k}")
     
     # Run evaluation
-    results = eval_all(repo_path, limit=k)
+    results = eval_all(repo_path, limit=k, detail=detail)
     
     # Print summary
     print_summary(results, k)
@@ -123,13 +189,12 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_file = output_dir / f"eval_{timestamp}.json"
     
-    with open(output_file, "w") as f:
-        json.dump({
-            "timestamp": timestamp,
-            "repo_path": str(repo_path),
-            "k": k,
-            "results": results,
-        }, f, indent=2)
+    output_file.write_bytes(orjson.dumps({
+        "timestamp": timestamp,
+        "repo_path": str(repo_path),
+        "k": k,
+        "results": results,
+    }, option=orjson.OPT_INDENT_2))
     
     console.print(f"\n[dim]Results saved to: {output_file}[/dim]")
 
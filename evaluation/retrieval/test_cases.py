@@ -1,5 +1,5 @@
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 class QueryCategory(Enum):
     FEATURE_SEARCH = "feature_search"      # "command line functions"
@@ -9,23 +9,28 @@ class QueryCategory(Enum):
     NATURAL_LANGUAGE = "natural_language"  # "I want to parse Python files"
 
 
-@dataclass
+@dataclass(frozen=True)
 class RetrievalQuery:
     query: str
     expected: list[str]
     category: QueryCategory
     description: str
+    expected_set: frozenset[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Built once at import instead of on every evaluation
+        object.__setattr__(self, "expected_set", frozenset(self.expected))
 
 RETRIEVAL_QUERIES = [
     # FEATURE SEARCH: Looking for specific functionality
     RetrievalQuery(
         query="command line functions",
         expected=[
-            "src/codecompass/cli.py::hello",
-            "src/codecompass/cli.py::index",
-            "src/codecompass/cli.py::search",
-            "src/codecompass/cli.py::status",
-            "src/codecompass/cli.py::chat",
+            "src/codecompass/cli/__init__.py::hello",
+            "src/codecompass/cli/index.py::index",
+            "src/codecompass/cli/search.py::search",
+            "src/codecompass/cli/status.py::status",
+            "src/codecompass/cli/chat.py::chat",
         ],
         category=QueryCategory.FEATURE_SEARCH,
         description="Should find all CLI commands defined with @app.command()",
@@ -34,7 +39,7 @@ RETRIEVAL_QUERIES = [
     RetrievalQuery(
         query="index a repository",
         expected=[
-            "src/codecompass/cli.py::index",
+            "src/codecompass/cli/index.py::index",
             "src/codecompass/indexing/store.py::index_repository",
             "src/codecompass/indexing/store.py::CodeStore.index_chunks",
         ],
@@ -45,7 +50,7 @@ RETRIEVAL_QUERIES = [
     RetrievalQuery(
         query="search code in repository",
         expected=[
-            "src/codecompass/cli.py::search",
+            "src/codecompass/cli/search.py::search",
             "src/codecompass/retrieval/search.py::search_code",
             "src/codecompass/indexing/store.py::CodeStore.search",
         ],
@@ -56,7 +61,7 @@ RETRIEVAL_QUERIES = [
     RetrievalQuery(
         query="interactive chat with codebase",
         expected=[
-            "src/codecompass/cli.py::chat",
+            "src/codecompass/cli/chat.py::chat",
             "src/codecompass/retrieval/rag.py::answer_question",
         ],
         category=QueryCategory.FEATURE_SEARCH,
@@ -197,7 +202,7 @@ RETRIEVAL_QUERIES = [
     RetrievalQuery(
         query="how do I ask questions about my code",
         expected=[
-            "src/codecompass/cli.py::chat",
+            "src/codecompass/cli/chat.py::chat",
             "src/codecompass/retrieval/rag.py::answer_question",
         ],
         category=QueryCategory.NATURAL_LANGUAGE,
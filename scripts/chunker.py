@@ -1,3 +1,4 @@
+from itertools import islice
 from pathlib import Path
 from pprint import pprint
 
@@ -6,70 +7,87 @@ from codecompass.indexing.chunker import PythonChunker  # Replace with your actu
 from tree_sitter import Parser, Language
 import tree_sitter_python as tspython
 
+# Loaded once per process and reused for every file dumped
+_LANG = Language(tspython.language())
+_PARSER = Parser(_LANG)
+
 def test_chunk_file():
     repo_root = Path(".")  # Current directory as repo root
-    file_path = Path("src/codecompass/cli.py")  # The sample file
+    file_path = Path("src/codecompass/cli/__init__.py")  # The sample file
 
 
     chunker = PythonChunker()
-    chunks = list(chunker.chunk_file(file_path, repo_root))
-    
 
-    gen = chunker.chunk_file(file_path, repo_root)  # only create generator once
-
-    pprint(next(gen))  # first chunk
-    pprint("~~~~~~~")
-    pprint(next(gen))  # second chunk
-    pprint("~~~~~~~")
-    pprint(next(gen))  # third chunk
-    pprint("~~~~~~~")
-    pprint(next(gen))  # fourth chunk
-    pprint("~~~~~~~")
-    pprint(next(gen))  # fifth chunk
-    pprint("~~~~~~~")
-    pprint(next(gen))  # sixth chunk
-    pprint("~~~~~~~")
+    # Print the first six chunks; islice stops the generator after them
+    for chunk in islice(chunker.chunk_file(file_path, repo_root), 6):
+        pprint(chunk)
+        pprint("~~~~~~~")
     
 
-def serialize_node(node, source_bytes):
-    return {
-        "type": node.type,
-        "is_named": node.is_named,
-        "start_byte": node.start_byte,
-        "end_byte": node.end_byte,
-        "start_point": {
-            "row": node.start_point.row,
-            "column": node.start_point.column,
-        },
-        "end_point": {
-            "row": node.end_point.row,
-            "column": node.end_point.column,
-        },
-        "text": source_bytes[node.start_byte:node.end_byte].decode(
-            "utf-8", errors="replace"
-        ),
-        "children": [
-            {
-                "field": node.field_name_for_child(i),
-                "node": serialize_node(child, source_bytes),
-            }
-            for i, child in enumerate(node.children)
-        ],
-    }
+def iter_node_json(root, indent="  "):
+    """Yield the AST under root as JSON, piece by piece (json.dump indent=2 layout).
 
-def make_ast_json_from_file(file_path: Path):
-    import json
+    Each node is an object with type, is_named, start/end byte, start/end point
+    ({row, column}), text and children ([{field, node}]).
+
+    Nodes are expanded from an explicit stack as they are written, so the full
+    AST dict is never built in memory.
+    """
+    from json import dumps
+
+    stack = [(root, 0)]
+    pop, push = stack.pop, stack.append
 
-    language = Language(tspython.language())
-    parser = Parser(language)
+    while stack:
+        item = pop()
+        if isinstance(item, str):
+            yield item
+            continue
 
-    file = file_path.read_bytes()
-    tree = parser.parse(file)
-    ast_dict = serialize_node(tree.root_node, file)
+        node, depth = item
+        close = "\n" + indent * depth
+        pad = close + indent
+        pad2 = pad + indent
+        start_point, end_point = node.start_point, node.end_point
+        yield (
+            "{" + pad + '"type": ' + dumps(node.type)
+            + "," + pad + '"is_named": ' + ("true" if node.is_named else "false")
+            + "," + pad + f'"start_byte": {node.start_byte}'
+            + "," + pad + f'"end_byte": {node.end_byte}'
+            + "," + pad + '"start_point": {'
+            + pad2 + f'"row": {start_point.row},' + pad2 + f'"column": {start_point.column}'
+            + pad + "},"
+            + pad + '"end_point": {'
+            + pad2 + f'"row": {end_point.row},' + pad2 + f'"column": {end_point.column}'
+            + pad + "},"
+            + pad + '"text": ' + dumps(node.text.decode("utf-8", errors="replace"))
+            + "," + pad + '"children": ['
+        )
+
+        children = node.children
+        if not children:
+            yield "]" + close + "}"
+            continue
+
+        # Pushed in reverse so they pop (and are written) in order
+        pad3 = pad2 + indent
+        push(pad + "]" + close + "}")
+        for i in range(len(children) - 1, -1, -1):
+            push(pad2 + "}")
+            push((children[i], depth + 3))
+            push(
+                ("," if i else "") + pad2 + "{"
+                + pad3 + '"field": ' + dumps(node.field_name_for_child(i))
+                + "," + pad3 + '"node": '
+            )
+
+
+def make_ast_json_from_file(file_path: Path):
+    tree = _PARSER.parse(file_path.read_bytes())
     with open(f'ast_jsons/{str(file_path).replace("/", ":")}.json', 'w', encoding='utf-8') as f:
-        json.dump(ast_dict, f, indent=2)
+        f.writelines(iter_node_json(tree.root_node))
 
 
 if __name__ == "__main__":
     # test_chunk_file()
-    make_ast_json_from_file(Path("src/codecompass/cli.py"))
+    make_ast_json_from_file(Path("src/codecompass/cli/__init__.py"))
@@ -12,20 +12,26 @@ from evaluation.retrieval.test_cases import RETRIEVAL_QUERIES
 # Load the index
 store = CodeStore(Path("."))
 
-# Convert LanceTable to a list of dicts using Arrow
-arrow_table = store.table.to_arrow()
-results = arrow_table.to_pylist()  
+# Read only the id column (skips code text and embedding vectors)
+table = store.table
+arrow_table = table.search().select(["id"]).limit(None).to_arrow()
 
 # Collect all indexed IDs
-actual_ids = set(r["id"] for r in results)
+actual_ids = set(arrow_table.column("id").to_pylist())
 print(f"Total chunks indexed: {len(actual_ids)}\n")
 
-# Check for missing IDs
+# Check for missing IDs: one set difference over every expected ID
+all_expected = frozenset().union(*(q.expected_set for q in RETRIEVAL_QUERIES))
+missing_ids = all_expected - actual_ids
+
+# Attribute missing IDs back to their queries
 missing = []
-for q in RETRIEVAL_QUERIES:
-    for expected_id in q.expected:
-        if expected_id not in actual_ids:
-            missing.append((q.query, expected_id))
+if missing_ids:
+    for q in RETRIEVAL_QUERIES:
+        # q.expected keeps the ground-truth order (the set's order varies run to run)
+        for expected_id in q.expected:
+            if expected_id in missing_ids:
+                missing.append((q.query, expected_id))
 
 if missing:
     print("❌ MISSING CHUNK IDs:")
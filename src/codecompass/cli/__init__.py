@@ -0,0 +1,53 @@
+from importlib import import_module
+import typer
+from typer.core import TyperGroup
+
+# Command name -> module defining it; imported only when the command is selected
+LAZY_COMMANDS = {
+    "index": "codecompass.cli.index",
+    "status": "codecompass.cli.status",
+    "search": "codecompass.cli.search",
+    "ask": "codecompass.cli.ask",
+    "chat": "codecompass.cli.chat",
+}
+
+
+class LazyGroup(TyperGroup):
+    """Click group that loads subcommand modules on demand."""
+
+    def list_commands(self, ctx) -> list[str]:
+        return [*super().list_commands(ctx), *LAZY_COMMANDS]
+
+    def get_command(self, ctx, cmd_name: str):
+        module_name = LAZY_COMMANDS.get(cmd_name)
+        if module_name is None:
+            return super().get_command(ctx, cmd_name)
+        return typer.main.get_command(import_module(module_name).app)
+
+
+app = typer.Typer(
+    name="codecompass",
+    help="AI-powered repository onboarding assistant",
+    cls=LazyGroup,
+)
+_console = None
+
+
+def _ensure_console():
+    """Create the rich Console on first use."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+
+@app.callback()
+def main():
+    # Keeps `app` a command group even though only `hello` is registered eagerly
+    pass
+
+@app.command()
+def hello():
+    """Test command."""
+    print("CodeCompass is working!")
@@ -0,0 +1,3 @@
+from codecompass.cli import app
+
+app(prog_name="codecompass")
@@ -0,0 +1,41 @@
+"""`codecompass ask` command."""
+
+from pathlib import Path
+import typer
+
+from codecompass.cli import _ensure_console
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def ask(
+    question: str = typer.Argument(..., help="Question about the codebase"),
+    repo_path: Path = typer.Option(
+        ".",
+        "--repo", "-r",
+        help="Path to the repository",
+        exists=True,
+    ),
+    search_type: int = typer.Option(
+        0,
+        "--stype", "-s",
+        help="Search strategy: 0=HyDE (default), 1=baseline, 2=query expansion"
+    ),
+):
+    """Ask a question about the codebase."""
+    from codecompass.retrieval.rag import answer_question
+    from rich.markdown import Markdown
+    console = _ensure_console()
+    
+    repo_path = repo_path.resolve()
+    
+    console.print(f"[dim]Searching codebase...[/dim]")
+    
+    try:
+        answer = answer_question(repo_path, question, search_type=search_type)
+        console.print("\n")
+        console.print(Markdown(answer))
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
@@ -0,0 +1,87 @@
+"""`codecompass chat` command."""
+
+from pathlib import Path
+import typer
+
+from codecompass.cli import _ensure_console
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def chat(
+    repo_path: Path = typer.Argument(
+        ".",
+        help="Path to the repository",
+        exists=True,
+    ),
+    search_type: int = typer.Option(
+        0,
+        "--stype", "-s",
+        help="Search strategy: 0=HyDE (default), 1=baseline, 2=query expansion"
+    ),
+):
+    """Start an interactive chat about the codebase."""
+    from codecompass.retrieval.rag import answer_question
+    from codecompass.indexing.store import CodeStore
+    from codecompass.llm.ollama import warm_in_background
+    from rich.markdown import Markdown
+    console = _ensure_console()
+
+    # Load the models while the user types their first question
+    warm_in_background()
+    
+    repo_path = repo_path.resolve()
+    store = CodeStore(repo_path)
+    
+    # Check if indexed
+    if not store.is_indexed():
+        console.print(f"[yellow]Repository not indexed. Indexing now...[/yellow]")
+        from codecompass.indexing.store import index_repository
+        index_repository(repo_path)
+    
+    stats = store.get_stats()
+    
+    search_names = {0: "HyDE", 1: "Baseline", 2: "Query Expansion"}
+    
+    console.print("\n[bold green]╔═══════════════════════════════════════════════════════╗[/bold green]")
+    console.print("[bold green]║           Welcome to CodeCompass! 🧭                   ║[/bold green]")
+    console.print("[bold green]╚═══════════════════════════════════════════════════════╝[/bold green]")
+    console.print(f"\n[dim]Repository:[/dim] {repo_path}")
+    console.print(f"[dim]Indexed chunks:[/dim] {stats.get('chunk_count', 'unknown')}")
+    console.print(f"[dim]Search strategy:[/dim] {search_names.get(search_type, 'HyDE')}")
+    console.print(f"\n[dim]Type 'exit' to quit, 'help' for commands.[/dim]\n")
+    
+    while True:
+        try:
+            question = console.input("[bold cyan]You:[/bold cyan] ").strip()
+            
+            if not question:
+                continue
+            
+            if question.lower() == "exit":
+                console.print("[dim]Goodbye![/dim]")
+                break
+            
+            if question.lower() == "help":
+                console.print("""
+[bold]Commands:[/bold]
+  exit     - Quit the chat
+  help     - Show this help message
+
+[bold]Tips:[/bold]
+  • Ask about specific functions: "What does the login function do?"
+  • Ask about architecture: "How is authentication implemented?"
+  • Ask for explanations: "Explain the UserService class"
+""")
+                continue
+            
+            console.print("[dim]Thinking...[/dim]")
+            answer = answer_question(repo_path, question, search_type=search_type)
+            console.print(f"\n[bold green]CodeCompass:[/bold green]")
+            console.print(Markdown(answer))
+            console.print()
+            
+        except KeyboardInterrupt:
+            console.print("\n[dim]Goodbye![/dim]")
+            break
@@ -0,0 +1,35 @@
+"""`codecompass index` command."""
+
+from pathlib import Path
+import typer
+
+from codecompass.cli import _ensure_console
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def index(
+    repo_path: Path = typer.Argument(
+        ".",
+        help="Path to repository",
+        exists=True
+    ),
+    full: bool = typer.Option(
+        False,
+        "--full",
+        help="Rebuild the whole index instead of only changed files"
+    )
+):
+    """Index repository into vectordb"""
+    from codecompass.indexing.store import index_repository
+    console = _ensure_console()
+    repo_path = repo_path.resolve()
+    console.print(f"[bold]Indexing:[/bold] {repo_path}")
+
+    try:
+        index_repository(repo_path, full=full)
+        console.print(f"[green]Indexing complete.[/green]")
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
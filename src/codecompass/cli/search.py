@@ -0,0 +1,57 @@
+"""`codecompass search` command."""
+
+from pathlib import Path
+import typer
+
+from codecompass.cli import _ensure_console
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def search(
+    query: str = typer.Argument(..., help="Search query"),
+    search_type: int = typer.Option(
+        0,
+        "--stype", "-s",
+        help="Type of search query - 0(default), 1(hyde search), 2(query expansion)"
+
+    ),
+    repo_path: Path = typer.Option(
+        ".",
+        "--repo", "-r",
+        help="Path to the repository",
+        exists=True,
+    ),
+    limit: int = typer.Option(5, "--limit", "-n", help="Number of results"),
+):
+    """Search for code in an indexed repository"""
+    from codecompass.retrieval.search import baseline_search, hyde_search, query_expansion_search
+    console = _ensure_console()
+    
+    repo_path = repo_path.resolve()
+    strategies = {0: hyde_search, 1: baseline_search, 2: query_expansion_search}
+    
+    if search_type not in strategies:
+        console.print("[red]Invalid search type[/red]")
+        raise typer.Exit(1)
+    
+    try:
+        results = strategies[search_type](repo_path, query, limit)
+        
+        if not results:
+            console.print("[yellow]No results found.[/yellow]")
+            return
+        
+        for r in results:
+            console.print(f"\n[bold blue]{r.name}[/bold blue] ({r.chunk_type})")
+            console.print(f"[dim]{r.file_path}:{r.start_line}-{r.end_line}[/dim]")
+            if r.docstring:
+                console.print(f"[italic]{r.docstring}[/italic]")
+            console.print(f"Score: [plain]{r.score:.4f}[/plain]", highlight=False)
+            
+            console.print("─" * 50)
+            
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
@@ -0,0 +1,33 @@
+"""`codecompass status` command."""
+
+from pathlib import Path
+import typer
+
+from codecompass.cli import _ensure_console
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def status(
+    repo_path: Path = typer.Argument(
+        ".",
+        help="Path to repository",
+        exists=True
+    )    
+):
+    from codecompass.indexing.store import CodeStore
+    console = _ensure_console()
+    repo_path = repo_path.resolve()
+    store = CodeStore(repo_path)
+
+    stats = store.get_stats()
+    
+    if stats["status"] == "not_indexed":
+        console.print(f"[yellow]Repository not indexed.[/yellow]")
+        console.print(f"Run: [bold]codecompass index {repo_path}[/bold]")
+    else:
+        console.print(f"[green]✓ Repository indexed[/green]")
+        console.print(f"  Path: [magenta]{stats['repo_path']}[/magenta]")
+        console.print(f"  Chunks: [cyan]{stats['chunk_count']}[/cyan]")
+        console.print(f"  Indexed at: [cyan][bold]{stats['indexed_at']}[/bold][/cyan]")
@@ -1,5 +1,6 @@
 from pathlib import Path
-from pydantic_settings import BaseSettings
+import os
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     # ollama
@@ -10,13 +11,26 @@ class Settings(BaseSettings):
     # indexing
     chunk_max_tokens: int = 512
     embedding_dimensions: int = 768
+    embed_batch_size: int = 64  # texts per Ollama embed request
+    embed_batch_max_bytes: int = 2_000_000  # caps a single request's payload
+    embed_cache_max_entries: int = 200_000  # on-disk embedding cache, 0 disables
+    # concurrent embed requests (CODECOMPASS_EMBED_WORKERS); they wait on Ollama rather than
+    # the CPU, so match the server's OLLAMA_NUM_PARALLEL slots, 4 by default
+    embed_workers: int = 4
+    chunk_workers: int = os.cpu_count() or 1  # processes parsing files, 1 disables
+
+    # generation
+    generate_cache_max_entries: int = 10_000  # on-disk cache of deterministic LLM replies, 0 disables
+
+    # search
+    query_cache_size: int = 256  # recent queries kept per store, 0 disables
+    query_cache_threshold: float = 0.97  # cosine similarity counted as the same query
+    exact_search_int8: bool = False  # int8 vectors for in-memory exact search (needs numba)
 
     # paths
     data_dir: Path = Path.home() / ".codecompass"
 
-    class ConfigDict:
-        env_prefix = "CODECAMPASS_"
-        env_file = ".env"
+    model_config = SettingsConfigDict(env_prefix="CODECOMPASS_", env_file=".env", extra="ignore")
 
 settings = Settings()
 
@@ -1,11 +1,57 @@
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+import mmap
+import multiprocessing
+import os
+import threading
 from typing import Iterator
 
+import numpy as np
 import tree_sitter_python as tspython
 from tree_sitter import Language, Parser
 import json
 
+from codecompass.config import settings
+
+# Directories never searched for source files
+IGNORE_DIRS = frozenset([
+    "venv", ".venv", "node_modules", "__pycache__",
+    ".git", "build", "dist", ".eggs", "scratch", "scripts", "evaluation"
+])
+
+# Bytes handed to tree-sitter per read callback
+PARSE_READ_SIZE = 64 * 1024
+
+# Below this many files, process start-up costs more than parsing saves
+PARALLEL_MIN_FILES = 32
+
+try:  # tree-sitter >= 0.25 runs queries through a QueryCursor
+    from tree_sitter import Query, QueryCursor
+except ImportError:
+    Query = QueryCursor = None
+
+DEFINITIONS_QUERY = "[(function_definition) (class_definition)] @definition"
+
+# Loaded once per process; the compiled query is read-only and can be shared
+_LANGUAGE = Language(tspython.language())
+if QueryCursor is not None:
+    _DEFINITIONS = Query(_LANGUAGE, DEFINITIONS_QUERY)
+else:
+    _DEFINITIONS = _LANGUAGE.query(DEFINITIONS_QUERY)
+
+# Parsers hold native mutable state, so each thread gets its own
+_thread_local = threading.local()
+
+
+def _get_parser() -> Parser:
+    """This thread's parser, created on first use"""
+    parser = getattr(_thread_local, "parser", None)
+    if parser is None:
+        parser = _thread_local.parser = Parser(_LANGUAGE)
+    return parser
+
 
 @dataclass
 class CodeChunk:
@@ -20,87 +66,135 @@ class CodeChunk:
     docstring: str | None
     parent_class: str | None
     imports: list[str] | None = None
+    import_modules: set[str] | None = None  # top-level modules named by imports
+
+class _SourceText:
+    """A file decoded once, sliced by tree-sitter byte offsets"""
+    __slots__ = ("text", "char_offsets")
+
+    def __init__(self, content: bytes):
+        self.text = str(content, "utf-8")
+        self.char_offsets = None  # ASCII: byte offsets are char offsets
+        if len(self.text) != len(content):
+            # Char index at each byte offset = number of UTF-8 lead bytes before it
+            lead = (np.frombuffer(content, dtype=np.uint8) & 0xC0) != 0x80
+            self.char_offsets = np.concatenate(([0], np.cumsum(lead)))
+
+    def __getitem__(self, byte_span: slice) -> str:
+        start, stop = byte_span.start, byte_span.stop
+        if self.char_offsets is not None:
+            start, stop = self.char_offsets[start], self.char_offsets[stop]
+        return self.text[start:stop]
+
 
 class PythonChunker:
     """Extract code from Python files with AST parsing"""
     def __init__(self):
-        self.language = Language(tspython.language())
-        self.parser = Parser(self.language)
+        self.language = _LANGUAGE
+        self.definitions_query = _DEFINITIONS
+
+    @property
+    def parser(self) -> Parser:
+        return _get_parser()
 
     def chunk_file(self, file_path: Path, repo_root: Path) -> Iterator[CodeChunk]:
         """Parse a Python file and yield code chunks"""
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return  # mmap can't map an empty file, and there is nothing to chunk
+            # Map the file instead of reading it: the parser pulls pages on demand
+            content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
         try:
-            # content = file_path.read_text(encoding="utf-8")
-            content_bytes = file_path.read_bytes()
+            tree = self.parser.parse(
+                lambda offset, _point: content[offset:offset + PARSE_READ_SIZE]
+            )
+            source = _SourceText(content)
         except UnicodeDecodeError:
-            return # skip binary files
-        
-        tree = self.parser.parse(content_bytes)
+            return  # skip files that aren't valid UTF-8
+        finally:
+            content.close()
+
         relative_path = str(file_path.relative_to(repo_root))
-        imports = self._extract_imports(tree.root_node, content_bytes)
-        for chunk in self._extract_chunks(tree.root_node, content_bytes, relative_path):
+        imports, import_modules = self._extract_imports(tree.root_node, source)
+        for chunk in self._extract_chunks(tree.root_node, source, relative_path):
             chunk.imports = imports  # attach imports to each chunk
+            chunk.import_modules = import_modules
             yield chunk
-        # yield from self._extract_chunks(tree.root_node, content_bytes, relative_path)
 
-    def _extract_imports(self, node, source: bytes) -> list[str]:
-        """Extract all imports from file"""
+    def _extract_imports(self, node, source: _SourceText) -> tuple[list[str], set[str]]:
+        """Extract all imports from file, plus the top-level modules they name"""
         imports = []
+        modules = set()
         for child in node.children:
-            if child.type in ("import_statement", "import_from_statement"):
-                imports.append(source[child.start_byte:child.end_byte].decode('utf-8'))
-        return imports
+            if child.type == "import_statement":
+                names = child.children_by_field_name("name")
+            elif child.type == "import_from_statement":
+                names = [child.child_by_field_name("module_name")]
+            else:
+                continue
+            imports.append(source[child.start_byte:child.end_byte])
 
-    def _extract_chunks(self, node, source: bytes, file_path: str, parent_class: str = None):
-        """Recurisvely extract chunks from AST nodes"""
+            # "import a.b as c, d" / "from a.b import c" → a, d (relative imports are skipped)
+            for name in names:
+                if name.type == "aliased_import":
+                    name = name.child_by_field_name("name")
+                if name.type == "dotted_name":
+                    first = name.children[0]
+                    modules.add(source[first.start_byte:first.end_byte])
+        return imports, modules
 
-        for child in node.children:
+    def _extract_chunks(self, node, source: _SourceText, file_path: str):
+        """Extract function/class chunks with a single tree-sitter query pass"""
+        for definition in self._find_definitions(node):
+            # Walk up once: definitions nested inside a function are skipped,
+            # and the nearest enclosing class makes a function a method
+            enclosing_class = None
+            nested = False
+            ancestor = definition.parent
+            while ancestor is not None:
+                if ancestor.type == "function_definition":
+                    nested = True
+                    break
+                if ancestor.type == "class_definition" and enclosing_class is None:
+                    enclosing_class = ancestor
+                ancestor = ancestor.parent
+            if nested:
+                continue
+
+            # decorated functions/classes (eg - @app.command()) keep the decorator in the code
+            parent = definition.parent
+            node_for_code = parent if parent.type == "decorated_definition" else None
+
+            if definition.type == "function_definition":
+                parent_class = self._get_name(enclosing_class, source) if enclosing_class else None
+                yield self._make_chunk(
+                    definition, source, file_path, "function", parent_class, node_for_code=node_for_code
+                )
+            else:
+                yield self._make_chunk(
+                    definition, source, file_path, "class", None, node_for_code=node_for_code
+                )
+
+    def _find_definitions(self, node) -> list:
+        """All function and class definition nodes under node, in source order"""
+        if QueryCursor is not None:
+            captures = QueryCursor(self.definitions_query).captures(node)
+        else:
+            captures = self.definitions_query.captures(node)
 
-            # decorated functions/classes (eg - @app.command())
-            if child.type == "decorated_definition":
-                # Find the actual function/class inside
-                for subchild in child.children:
-                    if subchild.type == "function_definition":
-                        yield self._make_chunk(
-                            subchild, source, file_path, "function", parent_class,
-                            node_for_code=child  # Use parent node for full code including decorator
-                        )
-                    elif subchild.type == "class_definition":
-                        class_name = self._get_name(subchild)
-                        yield self._make_chunk(
-                            subchild, source, file_path, "class", None,
-                            node_for_code=child
-                        )
-                        class_body = self._get_child_by_type(subchild, "block")
-                        if class_body:
-                            yield from self._extract_chunks(
-                                class_body, source, file_path, parent_class=class_name
-                            )
-
-            # functions
-            elif child.type == "function_definition":
-                yield self._make_chunk(child, source, file_path, "function", parent_class)
-
-            # classes
-            elif child.type == "class_definition":
-                class_name = self._get_name(child)
-                yield self._make_chunk(child, source, file_path, "class", None)
-
-                class_body = self._get_child_by_type(child, "block")
-                if class_body:
-                    yield from self._extract_chunks(
-                        class_body, source, file_path, parent_class=class_name
-                    )
-
-            elif child.type not in ("function_definition", "class_definition"):
-                yield from self._extract_chunks(child, source, file_path, parent_class)
+        if isinstance(captures, dict):
+            nodes = captures.get("definition", [])
+        else:  # tree-sitter < 0.23 returns [(node, capture_name), ...]
+            nodes = [capture for capture, _ in captures]
+        return sorted(nodes, key=lambda n: n.start_byte)
     
-    def _make_chunk(self, node, source: bytes, file_path: str, chunk_type: str, parent_class: str = None, node_for_code: any = None):
+    def _make_chunk(self, node, source: _SourceText, file_path: str, chunk_type: str, parent_class: str = None, node_for_code: any = None):
         """Create CodeChunk from AST node"""
-        name = self._get_name(node)
+        name = self._get_name(node, source)
 
         code_node = node_for_code or node
-        code = source[code_node.start_byte:code_node.end_byte].decode('utf-8')
+        code = source[code_node.start_byte:code_node.end_byte]
         docstring = self._extract_docstring(code_node, source)
 
         if parent_class:
@@ -121,11 +215,11 @@ class PythonChunker:
             parent_class=parent_class,
         )
 
-    def _get_name(self, node) -> str:
+    def _get_name(self, node, source: _SourceText) -> str:
         """Extract the name from a function or class definition."""
         for child in node.children:
             if child.type == "identifier":
-                return child.text.decode("utf-8")
+                return source[child.start_byte:child.end_byte]
         return "<unknown>"
     
     def _get_child_by_type(self, node, type_name: str):
@@ -135,7 +229,7 @@ class PythonChunker:
                 return child
         return None
     
-    def _extract_docstring(self, node, source: bytes) -> str | None:
+    def _extract_docstring(self, node, source: _SourceText) -> str | None:
         """Extract docstring from a function or class."""
         body = self._get_child_by_type(node, "block")
         if not body or not body.children:
@@ -145,28 +239,59 @@ class PythonChunker:
         if first_stmt.type == "expression_statement":
             expr = first_stmt.children[0] if first_stmt.children else None
             if expr and expr.type == "string":
-                docstring = source[expr.start_byte:expr.end_byte].decode('utf-8')
+                docstring = source[expr.start_byte:expr.end_byte]
                 # Clean up the docstring (remove quotes)
                 return docstring.strip('"""').strip("'''").strip()
         
         return None
 
 
+@lru_cache(maxsize=1)
+def _get_chunker() -> PythonChunker:
+    """One chunker (and parser) per worker process"""
+    return PythonChunker()
+
+
+def _chunk_one(path_and_root: tuple[Path, Path]) -> list[CodeChunk]:
+    """Chunk a single file; runs inside a worker process."""
+    file_path, repo_root = path_and_root
+    return list(_get_chunker().chunk_file(file_path, repo_root))
+
+
+def find_python_files(repo_path: Path) -> list[Path]:
+    """Python files in a repository, minus environments, build output and tooling."""
+    files = []
+    for root, dirs, names in os.walk(repo_path):
+        # Prune in place so ignored subtrees are never entered
+        dirs[:] = sorted(d for d in dirs if d not in IGNORE_DIRS and not d.endswith("egg-info"))
+        files.extend(Path(root, name) for name in sorted(names) if name.endswith(".py"))
+    return files
+
+
+def chunk_files(files: list[Path], repo_path: Path) -> Iterator[CodeChunk]:
+    """Chunk the given files of a repository, in file order."""
+    workers = min(settings.chunk_workers, len(files))
+    if workers <= 1 or len(files) < PARALLEL_MIN_FILES:
+        chunker = _get_chunker()
+        for file_path in files:
+            yield from chunker.chunk_file(file_path, repo_path)
+        return
+
+    # Files parse independently, so spread them across processes (results keep file order).
+    # spawn: callers such as index_repository already hold LanceDB's native threads,
+    # and forking a multi-threaded process can deadlock
+    args = [(file_path, repo_path) for file_path in files]
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        for chunks in executor.map(_chunk_one, args, chunksize=8):
+            yield from chunks
+
+
 def chunk_repository(repo_path: Path) -> Iterator[CodeChunk]:
     """Chunk all Python files in a repository."""
-    chunker = PythonChunker()
-    
-    ignore_patterns = [
-        "venv", ".venv", "node_modules", "__pycache__", 
-        ".git", "build", "dist", ".eggs", "egg-info", "scratch", "scripts", "evaluation"
-    ]
-
-    filtered_files = [
-        f for f in repo_path.rglob("*.py")
-        if not any(pattern in str(f) for pattern in ignore_patterns)
-    ]
+    filtered_files = find_python_files(repo_path)
 
     print(f"Found {len(filtered_files)} Python files.")
-    
-    for file_path in filtered_files:
-        yield from chunker.chunk_file(file_path, repo_path)
+
+    yield from chunk_files(filtered_files, repo_path)
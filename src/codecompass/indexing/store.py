@@ -1,31 +1,108 @@
 """Vector store for code chunks using LanceDB"""
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Optional
 import hashlib
 import json
+import math
+import threading
 
 import lancedb
-from pydantic import BaseModel
+import numpy as np
+import pyarrow as pa
 
 from codecompass.config import settings
 from codecompass.indexing.chunker import CodeChunk
-from codecompass.llm.ollama import embed
-
-class StoredChunk(BaseModel):
-    """LanceDB Schema for storing code chunks"""
-    id: str
-    file_path: str
-    name: str
-    chunk_type: str
-    code: str
-    start_line: int
-    end_line: int
-    docstring: Optional[str]
-    parent_class: Optional[str]
-    # Searchable text (code / docstring / name)
-    search_text: str
-    vector: list[float]
+from codecompass.llm.ollama import batch_texts, embed, embed_batch
+
+def _dot_rows_numpy(matrix, vector):
+    """Dot product of each row with vector"""
+    return matrix @ vector
+
+
+@lru_cache(maxsize=1)
+def _jit_kernels() -> tuple:
+    """(dot_rows, dot_rows_int8) similarity scans, JIT-compiled when numba is installed
+
+    numba is optional and slow to import, so it is only loaded on the first scan;
+    without it dot_rows is numpy and dot_rows_int8 is None (numpy has no int8
+    kernel that accumulates without overflow, so exact search stays float32).
+    """
+    try:
+        import numba
+    except ImportError:
+        return _dot_rows_numpy, None
+
+    @numba.njit(cache=True, fastmath=True)
+    def dot_rows(matrix, vector):
+        """Dot product of each row with vector (compiled on first call, cached on disk)"""
+        out = np.empty(matrix.shape[0], dtype=np.float32)
+        for i in range(matrix.shape[0]):
+            total = np.float32(0.0)
+            for j in range(matrix.shape[1]):
+                total += matrix[i, j] * vector[j]
+            out[i] = total
+        return out
+
+    @numba.njit(cache=True, fastmath=True)
+    def dot_rows_int8(matrix, vector):
+        """Int8 dot product of each row with vector, accumulated in int32"""
+        out = np.empty(matrix.shape[0], dtype=np.int32)
+        for i in range(matrix.shape[0]):
+            total = np.int32(0)
+            for j in range(matrix.shape[1]):
+                total += np.int32(matrix[i, j]) * np.int32(vector[j])
+            out[i] = total
+        return out
+
+    return dot_rows, dot_rows_int8
+
+
+def _quantize_rows(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric int8 quantization with one scale per row: matrix ~= codes * scales[:, None]"""
+    scales = np.abs(matrix).max(axis=1) / 127
+    scales[scales == 0] = 1.0
+    codes = np.round(matrix / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+# Below this many rows searches score every vector exactly with one in-memory
+# matrix-vector product (BLAS), which beats building and probing an ANN index
+VECTOR_INDEX_MIN_ROWS = 50_000
+# Reciprocal rank fusion constant, as in LanceDB's default hybrid reranker
+RRF_K = 60
+
+# HNSW graph: neighbours per node, beam width at build and at query time
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+# Rows per IVF partition; most repositories fit in a single HNSW graph
+HNSW_PARTITION_ROWS = 100_000
+
+# From this many rows, product-quantize instead: 16 dims per one-byte code
+# (48 bytes for a 768-d vector, 64x smaller than float32) keeps the index
+# cache-resident. The codes are lossy, so searches probe PQ_NPROBES partitions
+# and re-rank PQ_REFINE_FACTOR x limit candidates on the full vectors to win
+# the recall back; raising either trades speed for recall.
+PQ_MIN_ROWS = 100_000
+PQ_DIMS_PER_CODE = 16
+PQ_MAX_PARTITIONS = 1024
+PQ_NPROBES = 16
+PQ_REFINE_FACTOR = 5
+
+# Columns returned by searches (plus LanceDB's _relevance_score)
+RESULT_COLUMNS = [
+    "id", "file_path", "name", "chunk_type", "code", "start_line", "end_line", "docstring",
+]
+
+def index_dir(repo_path: Path) -> Path:
+    """Directory holding a repository's index, metadata and manifest."""
+    repo_path = repo_path.resolve()
+    path_hash = hashlib.sha256(str(repo_path).encode()).hexdigest()[:8]
+    return settings.data_dir / "indices" / f"{repo_path.name}-{path_hash}"
+
 
 class CodeStore:
     """Manages vector store for repo"""
@@ -36,12 +113,53 @@ class CodeStore:
         self.db = lancedb.connect(str(self.db_path))
         self.table_name = "code_chunks"
         self._table = None
+        # Stores are shared across threads (see retrieval.search._get_store)
+        self._qcache_lock = threading.Lock()
+        self._reset_query_cache()
+
+    def _reset_query_cache(self):
+        """Clear the semantic query cache (ring of recent query vectors -> results)"""
+        self._qcache_vecs = None  # (query_cache_size, dim) float32, rows L2-normalized
+        self._qcache_limits = None
+        self._qcache_results = [None] * settings.query_cache_size
+        self._qcache_len = 0
+        self._qcache_next = 0
+        # The exact-search matrix belongs to the same table version
+        self.__dict__.pop("_exact_vectors", None)
+
+    def _cached_search(self, query_vec: np.ndarray, limit: int) -> Optional[pa.Table]:
+        """Results of a previous near-identical query with the same limit, if any"""
+        with self._qcache_lock:
+            if not self._qcache_len:
+                return None
+            n = self._qcache_len
+            dot_rows, _ = _jit_kernels()
+            scores = dot_rows(self._qcache_vecs[:n], query_vec)
+            scores[self._qcache_limits[:n] != limit] = -1.0
+            best = int(scores.argmax())
+            if scores[best] >= settings.query_cache_threshold:
+                return self._qcache_results[best]
+            return None
+
+    def _cache_query(self, query_vec: np.ndarray, limit: int, results: pa.Table):
+        size = settings.query_cache_size
+        if not size:
+            return
+        with self._qcache_lock:
+            if self._qcache_vecs is None:
+                self._qcache_vecs = np.zeros((size, query_vec.shape[0]), dtype=np.float32)
+                self._qcache_limits = np.zeros(size, dtype=np.int64)
+            # FIFO: overwrite the oldest slot once full
+            slot = self._qcache_next
+            self._qcache_vecs[slot] = query_vec
+            self._qcache_limits[slot] = limit
+            self._qcache_results[slot] = results
+            self._qcache_next = (slot + 1) % size
+            self._qcache_len = min(self._qcache_len + 1, size)
 
     def _get_db_path(self) -> Path:
         """Generate unique database path for current repository."""
-        path_hash = hashlib.sha256(str(self.repo_path).encode()).hexdigest()[:8]
-        repo_name = self.repo_path.name
-        return settings.data_dir / "indices" / f"{repo_name}-{path_hash}"
+        return index_dir(self.repo_path)
     
     @property
     def table(self):
@@ -53,15 +171,18 @@ class CodeStore:
                 self._table = None
         return self._table
 
-    def wait_for_index(self, index_name, timeout: float = 5.0):
+    def wait_for_index(self, index_name, initial_interval: float = 0.1, max_interval: float = 5.0):
         import time
+        delay = initial_interval
         while True:
             indices = self.table.list_indices()
 
             if indices and any(index.name == index_name for index in indices):
                 break
             print(f"⏳ Waiting for {index_name} to be ready...")
-            time.sleep(timeout)
+            time.sleep(delay)
+            # Back off: small repos are ready almost at once, big ones aren't polled hard
+            delay = min(delay * 1.5, max_interval)
 
         print(f"✅ {index_name} is ready!")
 
@@ -71,33 +192,9 @@ class CodeStore:
         if not chunks:
             return 0
         
-        records = []
-
-        from rich.progress import Progress
-        with Progress() as progress:
-            task = progress.add_task("Embedding chunks...", total=len(chunks))
-
-            for chunk in chunks:
-                search_text = self._create_search_text(chunk)
-                
-                vector = embed(search_text)
-
-                records.append({
-                    "id": chunk.id,
-                    "file_path": chunk.file_path,
-                    "name": chunk.name,
-                    "chunk_type": chunk.chunk_type,
-                    "code": chunk.code,
-                    "start_line": chunk.start_line,
-                    "end_line": chunk.end_line,
-                    "docstring": chunk.docstring or "",
-                    "parent_class": chunk.parent_class or "",
-                    "search_text": search_text,
-                    "vector": vector,
-                })
-
-                progress.update(task, advance=1)
+        records = self._embed_table(chunks)
                 
+        self._reset_query_cache()
         self._table = self.db.create_table(
             self.table_name,
             records,
@@ -108,24 +205,117 @@ class CodeStore:
         self.table.create_fts_index("search_text")
         # Since create_fts_index is async, we wait to utilize hybrid search
         self.wait_for_index("search_text_idx")
-
-
+        self._create_vector_index(records.num_rows)
 
         # Collect all unique imports from chunks
-        all_imports = set()
-        for chunk in chunks:
-            if chunk.imports:
-                for imp in chunk.imports:
-                    # Extract module name: "from typer import ..." → "typer"
-                    if imp.startswith("from "):
-                        module = imp.split()[1].split(".")[0]
-                    elif imp.startswith("import "):
-                        module = imp.split()[1].split(".")[0].split(",")[0]
-                    all_imports.add(module)
+        all_imports = set().union(*(chunk.import_modules for chunk in chunks if chunk.import_modules))
     
-        self._save_metadata(len(records), list(all_imports))
+        self._save_metadata(records.num_rows, list(all_imports))
+
+        return records.num_rows
 
-        return len(records)
+    def update_chunks(self, chunks: list[CodeChunk], file_paths: list[str], imports: list[str]) -> int:
+        """Replace the chunks of the given files, leaving the rest of the index untouched"""
+        records = self._embed_table(chunks) if chunks else None
+
+        self._reset_query_cache()
+        if file_paths:
+            quoted = ", ".join("'" + path.replace("'", "''") + "'" for path in file_paths)
+            self.table.delete(f"file_path IN ({quoted})")
+        if records is not None:
+            self.table.add(records)
+
+        # Rebuild BM25 so it covers the new rows
+        self.table.create_fts_index("search_text", replace=True)
+        self.wait_for_index("search_text_idx")
+
+        count = self.table.count_rows()
+        if any(index.name == "vector_idx" for index in self.table.list_indices()):
+            self.table.optimize()  # fold the new rows into the existing vector index
+        else:
+            self._create_vector_index(count)
+        self._save_metadata(count, imports)
+        return count
+
+    def _create_vector_index(self, num_rows: int):
+        """ANN index on the vector column: HNSW, or IVF-PQ for very large tables
+
+        Smaller tables are searched exactly in memory (see _exact_search).
+        """
+        if num_rows < VECTOR_INDEX_MIN_ROWS:
+            return
+        # Vectors are stored unit length, so dot product ranks like cosine without normalizing
+        if num_rows >= PQ_MIN_ROWS:
+            dim = self.table.schema.field("vector").type.list_size
+            self.table.create_index(
+                metric="dot",
+                vector_column_name="vector",
+                index_type="IVF_PQ",
+                num_partitions=min(PQ_MAX_PARTITIONS, int(math.sqrt(num_rows))),
+                num_sub_vectors=dim // PQ_DIMS_PER_CODE,
+            )
+        else:
+            self.table.create_index(
+                metric="dot",
+                vector_column_name="vector",
+                index_type="IVF_HNSW_SQ",
+                num_partitions=math.ceil(num_rows / HNSW_PARTITION_ROWS),
+                m=HNSW_M,
+                ef_construction=HNSW_EF_CONSTRUCTION,
+            )
+        self.wait_for_index("vector_idx")
+
+    def _embed_table(self, chunks: list[CodeChunk]) -> pa.Table:
+        """Embed chunks and build their table rows as one columnar Arrow table"""
+        search_texts = [self._create_search_text(chunk) for chunk in chunks]
+
+        # Identical texts (boilerplate methods) are embedded once and shared
+        unique_index = {}
+        assignments = np.fromiter(
+            (unique_index.setdefault(text, len(unique_index)) for text in search_texts),
+            dtype=np.int64,
+            count=len(search_texts),
+        )
+        unique_texts = list(unique_index)
+
+        batches = list(batch_texts(unique_texts))
+        starts = np.cumsum([0] + [len(batch) for batch in batches[:-1]])
+        vectors = None
+
+        from rich.progress import Progress
+        with Progress() as progress:
+            task = progress.add_task("Embedding chunks...", total=len(unique_texts))
+
+            # One Ollama round-trip per batch, several batches in flight
+            with ThreadPoolExecutor(max_workers=settings.embed_workers) as executor:
+                futures = {
+                    executor.submit(embed_batch, batch): i for i, batch in enumerate(batches)
+                }
+                for future in as_completed(futures):
+                    i = futures[future]
+                    batch_vectors = future.result()
+                    if vectors is None:
+                        vectors = np.empty((len(unique_texts), batch_vectors.shape[1]), dtype=np.float32)
+                    vectors[starts[i]:starts[i] + len(batches[i])] = batch_vectors
+                    progress.update(task, advance=len(batches[i]))
+
+        if len(unique_texts) < len(search_texts):
+            vectors = vectors[assignments]
+
+        return pa.table({
+            "id": pa.array([chunk.id for chunk in chunks], pa.string()),
+            "file_path": pa.array([chunk.file_path for chunk in chunks], pa.string()),
+            "name": pa.array([chunk.name for chunk in chunks], pa.string()),
+            "chunk_type": pa.array([chunk.chunk_type for chunk in chunks], pa.string()),
+            "code": pa.array([chunk.code for chunk in chunks], pa.string()),
+            "start_line": pa.array([chunk.start_line for chunk in chunks], pa.int64()),
+            "end_line": pa.array([chunk.end_line for chunk in chunks], pa.int64()),
+            "docstring": pa.array([chunk.docstring or "" for chunk in chunks], pa.string()),
+            "parent_class": pa.array([chunk.parent_class or "" for chunk in chunks], pa.string()),
+            "search_text": pa.array(search_texts, pa.string()),
+            # One contiguous float32 buffer, viewed as fixed-size rows
+            "vector": pa.FixedSizeListArray.from_arrays(pa.array(vectors.reshape(-1)), vectors.shape[1]),
+        })
 
     def _create_search_text(self, chunk: CodeChunk) -> str:
         """Create searchable text from chunk"""
@@ -156,37 +346,169 @@ class CodeStore:
             "repo_path": str(self.repo_path),
             "indexed_at": datetime.now().isoformat(),
             "chunk_count": chunk_count,
-            "imports": imports or []
+            "imports": imports or [],
+            "embedding_model": settings.embedding_model,
         }
 
         metadata_path = self.db_path / "metadata.json"
         metadata_path.parent.mkdir(parents=True, exist_ok=True)
         metadata_path.write_text(json.dumps(metadata, indent=2))
+        self.__dict__.pop("stats", None)
+
+    def chunks_digest(self, chunks: list[CodeChunk]) -> str:
+        """Hash of what a file contributes to the index: chunk ids, search texts and the embedding model"""
+        digest = hashlib.sha256(settings.embedding_model.encode())
+        for chunk in chunks:
+            digest.update(f"\0{chunk.id}\0{self._create_search_text(chunk)}".encode())
+        return digest.hexdigest()
+
+    def load_manifest(self) -> dict:
+        """Per-file state from the last index run: {file_path: {mtime_ns, size, sha256, imports, chunks_sha256}}"""
+        manifest_path = self.db_path / "manifest.json"
+        if not manifest_path.exists():
+            return {}
+        return json.loads(manifest_path.read_text())
+
+    def save_manifest(self, manifest: dict):
+        """Save per-file state for the next incremental index run"""
+        manifest_path = self.db_path / "manifest.json"
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        manifest_path.write_text(json.dumps(manifest))
 
     def search(self, query: str, limit: int = 5) -> list[dict]:
         """Search for code chunks matching a query"""
-        if self.table is None:
+        results = self.search_arrow(query, limit=limit)
+        if results is None:
             return []
+        return results.to_pylist()
+
+    def search_arrow(self, query: str, limit: int = 5) -> Optional[pa.Table]:
+        """Search for code chunks, returning only the result columns as an Arrow table"""
+        if self.table is None:
+            return None
         
-        query_vector = embed(query)
-        # hybrid search
-        results = (
+        query_vector = embed(query)  # unit length, like the stored vectors
+        return self._search_vector(query, query_vector, limit)
+
+    def search_many(self, queries: list[str], limit: int = 5) -> Optional[list[pa.Table]]:
+        """Search for several queries, embedding them all in one Ollama request"""
+        if self.table is None:
+            return None
+
+        query_vectors = embed_batch(queries)
+        return [
+            self._search_vector(query, query_vector, limit)
+            for query, query_vector in zip(queries, query_vectors)
+        ]
+
+    def _search_vector(self, query: str, query_vector: np.ndarray, limit: int) -> pa.Table:
+        # Near-duplicate of a recent query: skip LanceDB entirely
+        cached = self._cached_search(query_vector, limit)
+        if cached is not None:
+            return cached
+
+        if self._exact_vectors is not None:
+            results = self._exact_search(query, query_vector, limit)
+        else:
+            results = self._index_search(query, query_vector, limit)
+
+        self._cache_query(query_vector, limit, results)
+        return results
+
+    @cached_property
+    def _exact_vectors(self) -> Optional[tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]]:
+        """(row ids, vector matrix, int8 row scales) held in memory while the table is small enough
+
+        With settings.exact_search_int8 the matrix holds int8 codes, a quarter of the
+        bytes streamed per search, at the cost of slightly coarser scores; scales is
+        None for the float32 matrix.
+        """
+        if self.table is None or self.table.count_rows() >= VECTOR_INDEX_MIN_ROWS:
+            return None
+        data = self.table.search().select(["vector"]).with_row_id(True).limit(None).to_arrow()
+        vectors = data.column("vector").combine_chunks()
+        matrix = vectors.flatten().to_numpy().reshape(-1, vectors.type.list_size)
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        if settings.exact_search_int8 and _jit_kernels()[1] is not None:
+            codes, scales = _quantize_rows(matrix)
+            return data.column("_rowid").to_numpy(), codes, scales
+        return data.column("_rowid").to_numpy(), matrix, None
+
+    def _exact_scores(self, query_vector: np.ndarray) -> np.ndarray:
+        """Dot product of the query with every stored vector"""
+        _, matrix, scales = self._exact_vectors
+        if scales is None:
+            return matrix @ query_vector
+        # The query's own scale is the same for every row, so it can't change the ranking
+        query_codes, _ = _quantize_rows(query_vector[None, :])
+        _, dot_rows_int8 = _jit_kernels()
+        return dot_rows_int8(matrix, query_codes[0]) * scales
+
+    def _exact_search(self, query: str, query_vector: np.ndarray, limit: int) -> pa.Table:
+        """Hybrid search with an exact in-memory vector leg, fused with BM25 by RRF"""
+        row_ids = self._exact_vectors[0]
+        scores = self._exact_scores(query_vector)
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k] if k else np.empty(0, dtype=np.intp)
+        vector_ids = row_ids[top[np.argsort(-scores[top], kind="stable")]].tolist()
+        return self._fuse(vector_ids, self._fts_row_ids(query, limit), limit)
+
+    def _index_search(self, query: str, query_vector: np.ndarray, limit: int) -> pa.Table:
+        """Hybrid search with the ANN index as the vector leg, fused with BM25 by RRF"""
+        # The legs run separately because a hybrid query applies one projection to both,
+        # and each must project its own score column to keep Lance's auto-projection
+        # warning off stderr
+        vector_ids = (
             self.table
-            .search(query_type="hybrid", fts_columns="search_text")
-            .vector(query_vector)
-            .text(query)
+            .search(query_vector)
+            .distance_type("dot")
+            .ef(max(HNSW_EF_SEARCH, limit))
+            .nprobes(PQ_NPROBES)
+            .refine_factor(PQ_REFINE_FACTOR)
+            .select(["_distance"])
+            .with_row_id(True)
             .limit(limit)
-            .to_list()
+            .to_arrow()
+            .column("_rowid")
+            .to_pylist()
         )
-        # vector search
-        # results = (
-        #     self.table
-        #     .search(query_vector)
-        #     .limit(limit)
-        #     .to_list()
-        # )
+        return self._fuse(vector_ids, self._fts_row_ids(query, limit), limit)
 
-        return results
+    def _fts_row_ids(self, query: str, limit: int) -> list[int]:
+        """Row ids of the BM25 matches on search_text, best first"""
+        return (
+            self.table
+            .search(query, query_type="fts", fts_columns="search_text")
+            .select(["_score"])
+            .with_row_id(True)
+            .limit(limit)
+            .to_arrow()
+            .column("_rowid")
+            .to_pylist()
+        )
+
+    def _fuse(self, vector_ids: list[int], fts_ids: list[int], limit: int) -> pa.Table:
+        """Result rows ranked by reciprocal rank fusion of the two legs"""
+        # Same fusion as LanceDB's RRFReranker: 1 / (rank + K), summed over both legs
+        fused = {}
+        for ids in (vector_ids, fts_ids):
+            for rank, row_id in enumerate(ids, 1):
+                fused[row_id] = fused.get(row_id, 0.0) + 1 / (rank + RRF_K)
+        best = sorted(fused, key=fused.__getitem__, reverse=True)[:limit]
+        if not best:  # empty table, e.g. every file was removed
+            schema = self.table.schema
+            return pa.schema(
+                [schema.field(name) for name in RESULT_COLUMNS]
+                + [pa.field("_relevance_score", pa.float32())]
+            ).empty_table()
+
+        # Only the result columns of the winning rows are read (vector and search_text never are)
+        rows = self.table.take_row_ids(best).with_row_id().select(RESULT_COLUMNS).to_arrow()
+        position = {row_id: i for i, row_id in enumerate(rows.column("_rowid").to_pylist())}
+        rows = rows.take([position[row_id] for row_id in best]).drop_columns(["_rowid"])
+        return rows.append_column(
+            "_relevance_score", pa.array([fused[row_id] for row_id in best], type=pa.float32())
+        )
 
     def get_stats(self) -> dict:
         """Get index stats"""
@@ -200,25 +522,94 @@ class CodeStore:
             **metadata
         }
 
+    @cached_property
+    def stats(self) -> dict:
+        """get_stats(), read once per store and refreshed when metadata is saved"""
+        return self.get_stats()
+
     def is_indexed(self) -> bool:
         """Check if the repository has been indexed"""
         return self.table is not None
     
-def index_repository(repo_path: Path) -> int:
-    """Index a repo and return number of chunks"""
-    from codecompass.indexing.chunker import chunk_repository
+def index_repository(repo_path: Path, full: bool = False) -> int:
+    """Index a repo and return number of chunks
+
+    Only files whose content changed since the last run are re-chunked and
+    re-embedded; full=True rebuilds the index from scratch.
+    """
+    from codecompass.indexing.chunker import chunk_files, find_python_files
 
     print(f"Indexing repository: {repo_path}")
 
-    chunks = list(chunk_repository(repo_path))
-    print(f"Found {len(chunks)} code chunks")
+    files = find_python_files(repo_path)
+    print(f"Found {len(files)} Python files.")
 
-    if not chunks:
-        print("No chunks found. Please check this is a Python repository.")
-        return 0
-    
     store = CodeStore(repo_path)
-    count = store.index_chunks(chunks)
+    previous = store.load_manifest() if store.is_indexed() and not full else {}
+    # Vectors from another embedding model can't be compared with new queries:
+    # rebuild everything, even files whose stat says they are unchanged
+    if previous and store.get_stats().get("embedding_model") != settings.embedding_model:
+        print("Embedding model changed, rebuilding the index")
+        previous = {}
+
+    # Unchanged stat means unchanged file; otherwise compare content hashes
+    manifest = {}
+    changed = []
+    for file_path in files:
+        rel_path = str(file_path.relative_to(repo_path))
+        stat = file_path.stat()
+        entry = previous.get(rel_path)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            manifest[rel_path] = entry
+            continue
+
+        digest = hashlib.sha256(file_path.read_bytes()).hexdigest()
+        if entry and entry["sha256"] == digest:
+            manifest[rel_path] = {**entry, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+            continue
+
+        manifest[rel_path] = {
+            "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest, "imports": [],
+        }
+        changed.append(file_path)
+    removed = [rel_path for rel_path in previous if rel_path not in manifest]
+
+    chunks = list(chunk_files(changed, repo_path))
+    file_chunks = {}
+    for chunk in chunks:
+        file_chunks.setdefault(chunk.file_path, []).append(chunk)
+
+    # A changed file whose chunks (and so embeddings) come out the same, e.g. an
+    # edit to module-level code, doesn't need its rows rewritten
+    stale = []
+    for file_path in changed:
+        rel_path = str(file_path.relative_to(repo_path))
+        entry = manifest[rel_path]
+        these_chunks = file_chunks.get(rel_path, [])
+        entry["imports"] = sorted(these_chunks[0].import_modules or ()) if these_chunks else []
+        entry["chunks_sha256"] = store.chunks_digest(these_chunks)
+        if entry["chunks_sha256"] != previous.get(rel_path, {}).get("chunks_sha256"):
+            stale.append(rel_path)
+    stale_chunks = [chunk for rel_path in stale for chunk in file_chunks.get(rel_path, [])]
+
+    if not previous:
+        print(f"Found {len(chunks)} code chunks")
+
+        if not chunks:
+            print("No chunks found. Please check this is a Python repository.")
+            return 0
+
+        count = store.index_chunks(chunks)
+    elif stale or removed:
+        print(f"Found {len(stale_chunks)} code chunks in {len(stale)} changed files, {len(removed)} removed")
+
+        imports = set().union(*(entry["imports"] for entry in manifest.values()))
+        count = store.update_chunks(stale_chunks, stale + removed, sorted(imports))
+    else:
+        print("No changes since last index")
+        count = store.table.count_rows()
+
+    store.save_manifest(manifest)
 
     print(f"✅ Indexed {count} chunks")
     return count
@@ -0,0 +1,164 @@
+"""Persistent embedding and generation caches backed by SQLite"""
+
+from pathlib import Path
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from codecompass.config import settings
+
+# SQLite caps the number of bound parameters per statement
+_MAX_PARAMS = 500
+
+
+class _SQLiteCache:
+    """Shared connection handling for the on-disk LRU caches"""
+
+    schema: tuple[str, ...] = ()
+    table: str = ""
+
+    def __init__(self, path: Path, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per process: worker processes open their own
+        if self._conn is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in self.schema:
+                conn.execute(statement)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used rows beyond max_entries (caller holds the lock)"""
+        (count,) = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY atime LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+
+class EmbeddingCache(_SQLiteCache):
+    """On-disk LRU cache of embedding vectors keyed by sha256(model, text)"""
+
+    table = "embeddings"
+    schema = (
+        "CREATE TABLE IF NOT EXISTS embeddings "
+        "(key BLOB PRIMARY KEY, dim INTEGER, vec BLOB, atime REAL)",
+        "CREATE INDEX IF NOT EXISTS embeddings_atime ON embeddings (atime)",
+    )
+
+    @staticmethod
+    def key(model: str, text: str) -> bytes:
+        """Cache key for a text embedded with a given model."""
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).digest()
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        """Return cached vectors for the keys that are present."""
+        found = {}
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            for i in range(0, len(keys), _MAX_PARAMS):
+                part = keys[i:i + _MAX_PARAMS]
+                marks = ",".join("?" * len(part))
+                rows = conn.execute(
+                    f"SELECT key, vec FROM embeddings WHERE key IN ({marks})", part
+                ).fetchall()
+                for key, vec in rows:
+                    found[key] = np.frombuffer(vec, dtype=np.float32)
+                if rows:
+                    conn.execute(
+                        f"UPDATE embeddings SET atime = ? WHERE key IN ({marks})", [now, *part]
+                    )
+            conn.commit()
+        return found
+
+    def put_many(self, items: list[tuple[bytes, np.ndarray]]):
+        """Store vectors, evicting least recently used entries over max_entries."""
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, vector in items:
+            vec = np.asarray(vector, dtype=np.float32)
+            rows.append((key, vec.shape[0], vec.tobytes(), now))
+
+        with self._lock:
+            conn = self._connect()
+            conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            self._evict(conn)
+            conn.commit()
+
+
+class GenerationCache(_SQLiteCache):
+    """On-disk LRU cache of chat completions keyed by sha256(model, system, prompt)"""
+
+    table = "generations"
+    schema = (
+        "CREATE TABLE IF NOT EXISTS generations "
+        "(key BLOB PRIMARY KEY, response TEXT, atime REAL)",
+        "CREATE INDEX IF NOT EXISTS generations_atime ON generations (atime)",
+    )
+
+    @staticmethod
+    def key(
+        model: str,
+        system: str | None,
+        prompt: str,
+        num_predict: int | None = None,
+        stop: list[str] | None = None,
+    ) -> bytes:
+        """Cache key for a prompt sent to a given model with a given system prompt."""
+        text = f"{model}\0{system or ''}\0{prompt}"
+        # Length limits change the reply; unlimited calls keep their original keys
+        if num_predict is not None or stop:
+            text += f"\0{num_predict}\0" + "\0".join(stop or ())
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def get(self, key: bytes) -> str | None:
+        """Return the cached response, if present."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT response FROM generations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE generations SET atime = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+        return row[0]
+
+    def put(self, key: bytes, response: str):
+        """Store a response, evicting least recently used entries over max_entries."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO generations VALUES (?, ?, ?)", (key, response, time.time())
+            )
+            self._evict(conn)
+            conn.commit()
+
+
+embedding_cache = (
+    EmbeddingCache(settings.data_dir / "embed_cache.sqlite", settings.embed_cache_max_entries)
+    if settings.embed_cache_max_entries > 0
+    else None
+)
+
+generation_cache = (
+    GenerationCache(settings.data_dir / "llm_cache.sqlite", settings.generate_cache_max_entries)
+    if settings.generate_cache_max_entries > 0
+    else None
+)
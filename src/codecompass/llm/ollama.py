@@ -1,33 +1,213 @@
+from typing import Iterator
+import asyncio
+import logging
+import threading
+
+import numpy as np
 import ollama
 from codecompass.config import settings
+from codecompass.llm.cache import embedding_cache, generation_cache
+
+logger = logging.getLogger(__name__)
 
-def generate(prompt: str, system: str = None, temperature: float = 0.0) -> str:
-    """Generate a response using Ollama."""
+def _chat_request(
+    prompt: str,
+    system: str | None,
+    temperature: float,
+    num_predict: int | None = None,
+    stop: list[str] | None = None,
+) -> dict:
+    """Arguments for one Ollama chat call"""
     messages = []
     
     if system:
         messages.append({"role": "system", "content": system})
     
     messages.append({"role": "user", "content": prompt})
-    
-    response = ollama.chat(
+
+    options = {"temperature": temperature}
+    # Cap decoding for prompts that only need a short reply
+    if num_predict is not None:
+        options["num_predict"] = num_predict
+    if stop:
+        options["stop"] = stop
+
+    return dict(
         model=settings.chat_model,
         messages=messages,
-        options={"temperature": temperature}, 
+        options=options,
         keep_alive="30m",
     )
+
+def _generation_key(
+    prompt: str,
+    system: str | None,
+    temperature: float,
+    num_predict: int | None,
+    stop: list[str] | None,
+) -> bytes | None:
+    # Only greedy (temperature 0) replies are repeatable enough to cache
+    if generation_cache is None or temperature != 0:
+        return None
+    return generation_cache.key(settings.chat_model, system, prompt, num_predict, stop)
+
+def generate(
+    prompt: str,
+    system: str | None = None,
+    temperature: float = 0.0,
+    *,
+    num_predict: int | None = None,
+    stop: list[str] | None = None,
+) -> str:
+    """Generate a response using Ollama.
+
+    num_predict caps the reply length in tokens and stop ends it at any of the
+    given strings. Greedy (temperature 0) replies are cached on disk by
+    sha256(model, system, prompt, limits), so repeated HyDE/expansion prompts skip the LLM.
+    """
+    cache_key = _generation_key(prompt, system, temperature, num_predict, stop)
+    if cache_key is not None:
+        cached = generation_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    response = ollama.chat(**_chat_request(prompt, system, temperature, num_predict, stop))
     
-    return response["message"]["content"]
+    content = response["message"]["content"]
+    if cache_key is not None:
+        generation_cache.put(cache_key, content)
+    return content
 
-def embed(text: str) -> list[float]:
-    """Generate embedding with Ollama"""
-    response = ollama.embeddings(
-        model = settings.embedding_model,
-        prompt = text,
-        keep_alive="30m",
+async def agenerate(
+    prompt: str,
+    system: str | None = None,
+    temperature: float = 0.0,
+    client: ollama.AsyncClient | None = None,
+    *,
+    num_predict: int | None = None,
+    stop: list[str] | None = None,
+) -> str:
+    """Async generate(), sharing its reply cache."""
+    cache_key = _generation_key(prompt, system, temperature, num_predict, stop)
+    if cache_key is not None:
+        cached = generation_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    client = client or ollama.AsyncClient()
+    response = await client.chat(
+        **_chat_request(prompt, system, temperature, num_predict, stop)
     )
-    return response["embedding"]
 
-def embed_batch(texts: list[str]) -> list[list[float]]:
-    """Generate batch embeddings with Ollama"""
-    return [embed(text) for text in texts]
+    content = response["message"]["content"]
+    if cache_key is not None:
+        generation_cache.put(cache_key, content)
+    return content
+
+def generate_batch(
+    prompts: list[str],
+    system: str | None = None,
+    temperature: float = 0.0,
+    limits: list[dict] | None = None,
+) -> list[str]:
+    """Generate replies to independent prompts concurrently
+
+    All requests are in flight at once, so Ollama can decode them together in its
+    parallel slots (OLLAMA_NUM_PARALLEL) instead of one after another. limits gives
+    each prompt's num_predict/stop keyword arguments.
+    """
+    limits = limits or [{}] * len(prompts)
+
+    async def run():
+        client = ollama.AsyncClient()
+        return await asyncio.gather(*(
+            agenerate(prompt, system, temperature, client, **limit)
+            for prompt, limit in zip(prompts, limits)
+        ))
+
+    return asyncio.run(run())
+
+def embed(text: str) -> np.ndarray:
+    """Generate embedding with Ollama as a float32 vector"""
+    return embed_batch([text])[0]
+
+def batch_texts(texts: list[str]) -> Iterator[list[str]]:
+    """Split texts into embed request batches, capped by count and size"""
+    batch = []
+    batch_bytes = 0
+    for text in texts:
+        text_bytes = len(text.encode("utf-8"))
+        if batch and (
+            len(batch) >= settings.embed_batch_size
+            or batch_bytes + text_bytes > settings.embed_batch_max_bytes
+        ):
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append(text)
+        batch_bytes += text_bytes
+    if batch:
+        yield batch
+
+def embed_batch(texts: list[str]) -> np.ndarray:
+    """Generate batch embeddings with Ollama (one request per batch)
+
+    Returns an (N, D) float32 matrix of unit-length rows. Vectors are cached on
+    disk by sha256(model, text); only texts missing from the cache are sent to Ollama.
+    """
+    if embedding_cache is None:
+        return _embed_uncached(texts)
+
+    keys = [embedding_cache.key(settings.embedding_model, text) for text in texts]
+    found = embedding_cache.get_many(keys)
+
+    missing = [i for i, key in enumerate(keys) if key not in found]
+    if missing:
+        new_vectors = _embed_uncached([texts[i] for i in missing])
+        new_items = [(keys[i], vector) for i, vector in zip(missing, new_vectors)]
+        embedding_cache.put_many(new_items)
+        found.update(new_items)
+
+    if not keys:
+        return np.empty((0, settings.embedding_dimensions), dtype=np.float32)
+    return np.stack([found[key] for key in keys])
+
+def _embed_uncached(texts: list[str]) -> np.ndarray:
+    # Same /api/embed endpoint for queries and chunks so their vectors match
+    batches = []
+    for batch in batch_texts(texts):
+        response = ollama.embed(
+            model = settings.embedding_model,
+            input = batch,
+            keep_alive="30m",
+        )
+        batches.append(np.asarray(response["embeddings"], dtype=np.float32))
+    # The model decides the dimension; the configured one only shapes an empty result
+    if not batches:
+        return np.empty((0, settings.embedding_dimensions), dtype=np.float32)
+    vectors = np.vstack(batches)
+    # Unit length, so cosine similarity is a plain dot product everywhere downstream
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+    return vectors
+
+def warm():
+    """Load the chat and embedding models into Ollama ahead of the first query
+
+    Both requests go straight to Ollama: the reply and embedding caches would
+    otherwise answer them without touching the models.
+    """
+    # A chat request with no messages only loads the model
+    ollama.chat(model=settings.chat_model, messages=[], keep_alive="30m")
+    ollama.embed(model=settings.embedding_model, input="warm", keep_alive="30m")
+
+def warm_in_background() -> threading.Thread:
+    """Run warm() on a daemon thread; if Ollama is down, the first real request reports it"""
+    def run():
+        try:
+            warm()
+        except Exception:
+            logger.debug("Warming the Ollama models failed", exc_info=True)
+
+    thread = threading.Thread(target=run, name="ollama-warm", daemon=True)
+    thread.start()
+    return thread
@@ -1,9 +1,8 @@
 from pathlib import Path
 
-from codecompass.indexing.store import CodeStore
 from codecompass.llm.ollama import generate
 from codecompass.retrieval.search import (
-    baseline_search, hyde_search, query_expansion_search
+    _get_store, baseline_search, hyde_search, query_expansion_search
 )
 
 SYSTEM_PROMPT = """You are CodeCompass, an AI assistant that helps developers understand codebases.
@@ -28,7 +27,7 @@ def answer_question(
 ) -> str:
     """Answer a question about a repository using RAG."""
 
-    store = CodeStore(repo_path)
+    store = _get_store(repo_path)
     if not store.is_indexed():
         return f"Repository not indexed. Please run: codecompass index {repo_path}"
 
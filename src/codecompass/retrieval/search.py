@@ -2,12 +2,19 @@
 """Search functionality for CodeCompass."""
 
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import starmap
+from operator import itemgetter
+from typing import Optional
+import os
+import re
 
-from codecompass.indexing.store import CodeStore
-from codecompass.llm.ollama import generate
+from codecompass.indexing.store import CodeStore, index_dir
+from codecompass.llm.ollama import generate, generate_batch
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SearchResult:
     """A search result with relevance score."""
     id: str
@@ -18,45 +25,89 @@ class SearchResult:
     start_line: int
     end_line: int
     docstring: str
-    score: float  # Similarity score (lower = more similar for L2 distance)
+    score: float  # Hybrid relevance score (higher = more similar; vectors ranked by cosine)
     
     def format(self) -> str:
         """Format the result for display."""
         location = f"{self.file_path}:{self.start_line}-{self.end_line}"
         header = f"📄 {self.name} ({self.chunk_type}) - {location}"
         
-        code_preview = self.code[:500] + "..." if len(self.code) > 500 else self.code
+        # One slice either way; short code comes back whole
+        code = self.code
+        code_preview = code[:500]
+        if len(code) > 500:
+            code_preview += "..."
         
         return f"{header}\n{code_preview}"
 
 
-def search_code(repo_path: Path, query: str, limit: int = 5) -> list[SearchResult]:
-    """Search for code in an indexed repository."""
-    import pprint
-    store = CodeStore(repo_path)
+def _index_mtime(repo_path: Path) -> Optional[int]:
+    """When the index was last written (metadata.json is rewritten on every index)"""
+    try:
+        return (index_dir(repo_path) / "metadata.json").stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+@lru_cache(maxsize=8)
+def _open_store(repo_path: Path, index_mtime: Optional[int]) -> CodeStore:
+    return CodeStore(repo_path)
+
+
+def _get_store(repo_path: Path) -> CodeStore:
+    """CodeStore shared across searches; reopened once the index is rewritten."""
+    repo_path = repo_path.resolve()
+    return _open_store(repo_path, _index_mtime(repo_path))
+
+
+@lru_cache(maxsize=8)
+def _load_import_set(repo_path: Path, index_mtime: Optional[int]) -> frozenset[str]:
+    return frozenset(_open_store(repo_path, index_mtime).stats.get("imports", []))
+
+
+def _get_import_set(repo_path: Path) -> frozenset[str]:
+    """Modules imported anywhere in the repo, for O(1) membership tests."""
+    repo_path = repo_path.resolve()
+    return _load_import_set(repo_path, _index_mtime(repo_path))
+
+
+@lru_cache(maxsize=32)
+def _load_imports_str(repo_path: Path, index_mtime: Optional[int], n: int) -> str:
+    return ", ".join(_open_store(repo_path, index_mtime).stats.get("imports", [])[:n])
+
+
+def _imports_str(repo_path: Path, n: int) -> str:
+    """The first n imported modules, comma separated, as the context prompts show them."""
+    repo_path = repo_path.resolve()
+    return _load_imports_str(repo_path, _index_mtime(repo_path), n)
+
+
+def search_code(
+    repo_path: Path, query: str = None, limit: int = 5, *, queries: list[str] = None
+) -> list[SearchResult] | list[list[SearchResult]]:
+    """Search for code in an indexed repository.
+
+    Pass queries= instead of query to run several searches with one embedding
+    request; the results then come back as one list per query.
+    """
+    store = _get_store(repo_path)
     
     if not store.is_indexed():
         raise ValueError(f"Repository not indexed. Run: codecompass index {repo_path}")
     
-    raw_results = store.search(query, limit=limit)
-    
-    results = []
-    for r in raw_results:
-        # summary = {k: r[k] for k in r if k != "code"}  
-        # pprint.pprint(summary)
-        results.append(SearchResult(
-            id=r["id"],
-            file_path=r["file_path"],
-            name=r["name"],
-            chunk_type=r["chunk_type"],
-            code=r["code"],
-            start_line=r["start_line"],
-            end_line=r["end_line"],
-            docstring=r.get("docstring", ""),
-            score=r.get("_relevance_score", 0.0),
-        ))
-    
-    return results
+    if queries is not None:
+        return [_to_results(table) for table in store.search_many(queries, limit=limit)]
+    return _to_results(store.search_arrow(query, limit=limit))
+
+# Result columns in SearchResult field order
+_result_columns = itemgetter(
+    "id", "file_path", "name", "chunk_type", "code", "start_line", "end_line", "docstring",
+    "_relevance_score",
+)
+
+def _to_results(table) -> list[SearchResult]:
+    # Build results positionally from parallel column lists rather than a dict per row
+    return list(starmap(SearchResult, zip(*_result_columns(table.to_pydict()))))
 
 # Baseline Search
 def baseline_search(repo_path: Path, query: str, limit: int = 5):
@@ -64,42 +115,43 @@ def baseline_search(repo_path: Path, query: str, limit: int = 5):
     return results
 
 # HYDE
-def hyde_search(repo_path: Path, query: str, limit: int = 5):
-    prompt = f"""Write a 3-5 line Python function that would match this search query.
+def _hyde_prompt(repo_path: Path, query: str) -> str:
+    return f"""Write a 3-5 line Python function that would match this search query.
 Output ONLY the code, no explanation.
 
 Query: {query}
 ````python
 """
-    hypothetical = generate(prompt)
-    hypothetical = hypothetical.strip()
+
+def _hyde_query(query: str, response: str) -> str:
+    hypothetical = response.strip()
     if hypothetical.startswith("```"):
         hypothetical = hypothetical.split("```")[1]
         hypothetical = hypothetical.replace("python", "", 1).strip()
-    results = search_code(repo_path, hypothetical, limit=limit)
-    return results
+    return hypothetical
 
-# EXPANDED QUERY
-def query_expansion_search(repo_path: Path, query: str, limit: int = 5):
+def hyde_search(repo_path: Path, query: str, limit: int = 5):
+    return _expanded_search("hyde", repo_path, query, limit)
 
-    prompt = f"""Add 5-10 related technical keywords to this code search query.
+# EXPANDED QUERY
+def _expansion_prompt(repo_path: Path, query: str) -> str:
+    return f"""Add 5-10 related technical keywords to this code search query.
 Only output the expanded query, nothing else.
 
 Query: {query}
 Expanded query:"""
-    expanded_query = generate(prompt)
-    results = search_code(repo_path, expanded_query, limit=limit)
-    return results
+
+def _use_response(query: str, response: str) -> str:
+    return response
+
+def query_expansion_search(repo_path: Path, query: str, limit: int = 5):
+    return _expanded_search("query_expansion", repo_path, query, limit)
 
 # EXPANDED QUERY WITH CONTEXT
-def query_expansion_search_context(repo_path: Path, query: str, limit: int = 5):
-        
-    store = CodeStore(repo_path)
-    stats = store.get_stats()
-    imports = stats.get("imports", [])[:100]
-    imports_str = ", ".join(imports) if imports else "standard Python libraries"
+def _context_prompt(repo_path: Path, query: str) -> str:
+    imports_str = _imports_str(repo_path, 100) or "standard Python libraries"
     
-    prompt = f"""Add 5-10 keywords to this code search query.
+    return f"""Add 5-10 keywords to this code search query.
 This repo uses these libraries: {imports_str}
 
 ONLY add keywords that are directly relevant to the query.
@@ -107,115 +159,185 @@ Do NOT list unrelated libraries.
 
 Query: {query}
 Expanded query:"""
-    expanded_query = generate(prompt)
-    results = search_code(repo_path, expanded_query, limit=limit)
-    return results
+
+def query_expansion_search_context(repo_path: Path, query: str, limit: int = 5):
+    return _expanded_search("query_expansion_context", repo_path, query, limit)
 
 # -----------------------------------------------------------------------------
 # Additional evaluations query expansion w/ context with different prompts
 # -----------------------------------------------------------------------------
 
+def _append_response(query: str, response: str) -> str:
+    return f"{query} {response.strip()}"  # Always include original
+
 # Variation 1: Fewer imports (15) + always prepend original query
-def query_expansion_context_v1(repo_path: Path, query: str, limit: int = 5):
-    """Fewer imports, always include original query."""
-    from codecompass.indexing.store import CodeStore
-    
-    store = CodeStore(repo_path)
-    stats = store.get_stats()
-    imports = stats.get("imports", [])[:15]  # Reduced from 100
-    imports_str = ", ".join(imports)
+def _context_v1_prompt(repo_path: Path, query: str) -> str:
+    imports_str = _imports_str(repo_path, 15)  # Reduced from 100
     
-    prompt = f"""Add 3-5 relevant keywords to this search query.
+    return f"""Add 3-5 relevant keywords to this search query.
 Available libraries: {imports_str}
 
 Query: {query}
 Keywords:"""
-    keywords = generate(prompt).strip()
-    expanded = f"{query} {keywords}"  # Always include original
-    
-    results = search_code(repo_path, expanded, limit=limit)
-    return results
+
+def query_expansion_context_v1(repo_path: Path, query: str, limit: int = 5):
+    """Fewer imports, always include original query."""
+    return _expanded_search("context_v1", repo_path, query, limit)
 
 
 # Variation 2: Pick from list (more constrained)
-def query_expansion_context_v2(repo_path: Path, query: str, limit: int = 5):
-    """Ask LLM to pick relevant imports from the list."""
-    from codecompass.indexing.store import CodeStore
-    
-    store = CodeStore(repo_path)
-    stats = store.get_stats()
-    imports = stats.get("imports", [])[:20]
-    imports_str = ", ".join(imports)
+def _context_v2_prompt(repo_path: Path, query: str) -> str:
+    imports_str = _imports_str(repo_path, 20)
     
-    prompt = f"""Which of these libraries are relevant to the query? 
+    return f"""Which of these libraries are relevant to the query? 
 Pick 1-3 that are most relevant. Output only library names separated by spaces.
 
 Libraries: {imports_str}
 Query: {query}
 Relevant:"""
-    relevant = generate(prompt).strip()
-    expanded = f"{query} {relevant}"
-    
-    results = search_code(repo_path, expanded, limit=limit)
-    return results
+
+def query_expansion_context_v2(repo_path: Path, query: str, limit: int = 5):
+    """Ask LLM to pick relevant imports from the list."""
+    return _expanded_search("context_v2", repo_path, query, limit)
 
 
 # Variation 3: Minimal prompt
-def query_expansion_context_v3(repo_path: Path, query: str, limit: int = 5):
-    """Minimal prompt"""
-    from codecompass.indexing.store import CodeStore
-    
-    store = CodeStore(repo_path)
-    stats = store.get_stats()
-    imports = stats.get("imports", [])[:100]
-    imports_str = ", ".join(imports)
+def _context_v3_prompt(repo_path: Path, query: str) -> str:
+    imports_str = _imports_str(repo_path, 100)
     
-    prompt = f"""Query: {query}
+    return f"""Query: {query}
 Repo uses: {imports_str}
 Only output the terms, nothing else.
 Add 2-3 related terms:"""
-    terms = generate(prompt).strip()
-    expanded = f"{query} {terms}"
-    
-    results = search_code(repo_path, expanded, limit=limit)
-    return results
+
+def query_expansion_context_v3(repo_path: Path, query: str, limit: int = 5):
+    """Minimal prompt"""
+    return _expanded_search("context_v3", repo_path, query, limit)
+
+
+# Decode limits: expansions are a line of keywords, HyDE a few lines of code
+EXPANSION_LIMITS = {"num_predict": 48, "stop": ["\n\n"]}
+HYDE_LIMITS = {"num_predict": 128}
+
+# LLM-backed variants: name -> (build prompt, turn LLM response into the search query, decode limits)
+LLM_VARIANTS = {
+    "hyde": (_hyde_prompt, _hyde_query, HYDE_LIMITS),
+    "query_expansion": (_expansion_prompt, _use_response, EXPANSION_LIMITS),
+    "query_expansion_context": (_context_prompt, _use_response, EXPANSION_LIMITS),
+    "context_v1": (_context_v1_prompt, _append_response, EXPANSION_LIMITS),
+    "context_v2": (_context_v2_prompt, _append_response, EXPANSION_LIMITS),
+    "context_v3": (_context_v3_prompt, _append_response, EXPANSION_LIMITS),
+}
+
+def _expanded_search(variant: str, repo_path: Path, query: str, limit: int):
+    build_prompt, to_query, limits = LLM_VARIANTS[variant]
+    response = generate(build_prompt(repo_path, query), **limits)
+    return search_code(repo_path, to_query(query, response), limit=limit)
+
+def run_all_variants(repo_path: Path, query: str, limit: int = 5) -> dict[str, list[SearchResult]]:
+    """Run every LLM variant for one query, sending all their prompts to Ollama at once."""
+    prompts = [build_prompt(repo_path, query) for build_prompt, _, _ in LLM_VARIANTS.values()]
+    responses = generate_batch(prompts, limits=[limits for _, _, limits in LLM_VARIANTS.values()])
+    expanded = [
+        to_query(query, response)
+        for (_, to_query, _), response in zip(LLM_VARIANTS.values(), responses)
+    ]
+    return dict(zip(LLM_VARIANTS, search_code(repo_path, queries=expanded, limit=limit)))
 
 
 # Variation 4: No LLM - rule-based matching
+# Query keyword -> modules whose presence in the repo's imports hints at the topic
+ASSOCIATIONS = {
+    "embed": ["ollama", "sentence_transformers", "nomic"],
+    "chunk": ["tree_sitter", "ast"],
+    "vector": ["lancedb", "chromadb", "faiss"],
+    "search": ["lancedb", "vector"],
+    "cli": ["typer", "click", "argparse"],
+    "command": ["typer", "click"],
+    "parse": ["tree_sitter", "ast"],
+    "llm": ["ollama", "openai", "anthropic"],
+    "generate": ["ollama", "openai"],
+    "store": ["lancedb", "database"],
+    "index": ["lancedb", "vector"],
+    "rag": ["lancedb", "ollama", "retrieval"],
+}
+
+
+# Words, with CamelCase identifiers split into their parts ("CodeStore" -> code, store)
+_WORD = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])")
+
+def _query_keywords(query: str) -> list[str]:
+    """ASSOCIATIONS keywords that start a word of the query.
+
+    Prefixes catch plurals and derived forms ("embeddings" -> embed) without
+    firing inside words ("reindexed" doesn't match index).
+    """
+    query_tokens = {token.lower() for token in _WORD.findall(query)}
+    return [
+        keyword for keyword in ASSOCIATIONS
+        if any(token.startswith(keyword) for token in query_tokens)
+    ]
+
+def _matched_imports(repo_path: Path, query: str) -> list[str]:
+    """Imported modules associated with words in the query."""
+    imports = _get_import_set(repo_path)
+
+    # dict.fromkeys dedups while keeping association order
+    matched = list(dict.fromkeys(
+        term
+        for keyword in _query_keywords(query)
+        for term in ASSOCIATIONS[keyword]
+        if term in imports
+    ))
+    return matched[:5]
+
 def query_expansion_context_v4(repo_path: Path, query: str, limit: int = 5):
     """No LLM, just match query words to imports."""
-    from codecompass.indexing.store import CodeStore
-    
-    store = CodeStore(repo_path)
-    stats = store.get_stats()
-    imports = stats.get("imports", [])
-    
-    query_lower = query.lower()
-    matched = []
-    
-    # Simple associations
-    associations = {
-        "embed": ["ollama", "sentence_transformers", "nomic"],
-        "chunk": ["tree_sitter", "ast"],
-        "vector": ["lancedb", "chromadb", "faiss"],
-        "search": ["lancedb", "vector"],
-        "cli": ["typer", "click", "argparse"],
-        "command": ["typer", "click"],
-        "parse": ["tree_sitter", "ast"],
-        "llm": ["ollama", "openai", "anthropic"],
-        "generate": ["ollama", "openai"],
-        "store": ["lancedb", "database"],
-        "index": ["lancedb", "vector"],
-        "rag": ["lancedb", "ollama", "retrieval"],
-    }
-    
-    for keyword, related in associations.items():
-        if keyword in query_lower:
-            for term in related:
-                if term in imports and term not in matched:
-                    matched.append(term)
-    
-    expanded = f"{query} {' '.join(matched[:5])}"
-    
+    matched = _matched_imports(repo_path, query)
+    expanded = f"{query} {' '.join(matched)}"
+
     results = search_code(repo_path, expanded, limit=limit)
-    return results
\ No newline at end of file
+    return results
+
+
+# Rule-based terms needed before the LLM is skipped
+SMART_MIN_TERMS = 3
+
+def smart_expansion_search(repo_path: Path, query: str, limit: int = 5):
+    """v4's rule-based expansion when it finds enough terms, otherwise v3's LLM expansion."""
+    matched = _matched_imports(repo_path, query)
+    if len(matched) >= SMART_MIN_TERMS:
+        return search_code(repo_path, f"{query} {' '.join(matched)}", limit=limit)
+    return query_expansion_context_v3(repo_path, query, limit)
+
+
+VARIANTS = {
+    "baseline": baseline_search,
+    "hyde": hyde_search,
+    "query_expansion": query_expansion_search,
+    "query_expansion_context": query_expansion_search_context,
+    "context_v1": query_expansion_context_v1,
+    "context_v2": query_expansion_context_v2,
+    "context_v3": query_expansion_context_v3,
+    "context_v4": query_expansion_context_v4,
+    "smart_expansion": smart_expansion_search,
+}
+
+def _ollama_parallel() -> int:
+    """OLLAMA_NUM_PARALLEL as a positive int; unset, empty or invalid means one slot per variant"""
+    try:
+        slots = int(os.environ.get("OLLAMA_NUM_PARALLEL", ""))
+    except ValueError:
+        return len(VARIANTS)
+    return slots if slots > 0 else len(VARIANTS)
+
+def evaluate_all(repo_path: Path, query: str, limit: int = 5) -> dict[str, list[SearchResult]]:
+    """Run every search variant for one query on a thread pool.
+
+    The variants are independent Ollama + LanceDB calls, so their LLM decoding
+    overlaps; threads are capped at OLLAMA_NUM_PARALLEL when it is set, since
+    Ollama queues requests beyond its parallel slots anyway.
+    """
+    with ThreadPoolExecutor(max_workers=min(len(VARIANTS), _ollama_parallel())) as executor:
+        results = executor.map(lambda search: search(repo_path, query, limit), VARIANTS.values())
+        return dict(zip(VARIANTS, results))
@@ -0,0 +1,37 @@
+# tests/conftest.py
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from codecompass.config import settings
+from codecompass.llm.cache import embedding_cache, generation_cache
+
+# Linux tmpfs; elsewhere tests use the default temp dir
+TMPFS = Path("/dev/shm")
+
+
+@pytest.fixture(autouse=True, scope="session")
+def tmpfs_workspace():
+    """Keep test repos, LanceDB indexes and LLM caches out of ~/.codecompass, in memory where possible."""
+    # The caches are built at import with the real data_dir, so move them as well
+    caches = [cache for cache in (embedding_cache, generation_cache) if cache is not None]
+    old_tempdir, old_data_dir = tempfile.tempdir, settings.data_dir
+    old_cache_paths = [cache.path for cache in caches]
+
+    # One directory for the whole session, so files tests leave behind go with it
+    with tempfile.TemporaryDirectory(
+        prefix="codecompass-tests-", dir=TMPFS if TMPFS.is_dir() else None
+    ) as workspace:
+        tempfile.tempdir = workspace
+        settings.data_dir = Path(workspace) / "data"
+        for cache in caches:
+            cache.path, cache._conn = settings.data_dir / cache.path.name, None
+        try:
+            yield
+        finally:
+            for cache, path in zip(caches, old_cache_paths):
+                if cache._conn is not None:
+                    cache._conn.close()
+                cache.path, cache._conn = path, None
+            tempfile.tempdir, settings.data_dir = old_tempdir, old_data_dir
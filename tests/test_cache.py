@@ -0,0 +1,39 @@
+# tests/test_cache.py
+import tempfile
+from pathlib import Path
+from codecompass.llm.cache import EmbeddingCache, GenerationCache
+
+
+def test_cache_round_trip_and_eviction():
+    """Test storing vectors and evicting the least recently used entry."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = EmbeddingCache(Path(tmpdir) / "cache.sqlite", max_entries=2)
+        a, b, c = (EmbeddingCache.key("model", t) for t in ("a", "b", "c"))
+
+        cache.put_many([(a, [0.5, 1.0])])
+        cache.put_many([(b, [2.0, 3.0])])
+        assert cache.get_many([a])[a].tolist() == [0.5, 1.0]  # refreshes a
+
+        cache.put_many([(c, [4.0, 5.0])])
+        assert set(cache.get_many([a, b, c])) == {a, c}
+
+
+def test_generation_cache_keys_and_eviction():
+    """Test responses are keyed by model, system prompt and prompt."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = GenerationCache(Path(tmpdir) / "llm.sqlite", max_entries=1)
+        key = GenerationCache.key("model", None, "prompt")
+        assert key != GenerationCache.key("model", "system", "prompt")
+        assert key != GenerationCache.key("model", None, "prompt", num_predict=48)
+
+        cache.put(key, "answer")
+        assert cache.get(key) == "answer"
+
+        cache.put(GenerationCache.key("model", None, "other"), "other answer")
+        assert cache.get(key) is None
+
+
+if __name__ == "__main__":
+    test_cache_round_trip_and_eviction()
+    test_generation_cache_keys_and_eviction()
+    print("\nAll cache tests passed!")
@@ -1,7 +1,7 @@
 # tests/test_chunker.py
 import tempfile
 from pathlib import Path
-from codecompass.indexing.chunker import PythonChunker, chunk_repository
+from codecompass.indexing.chunker import PythonChunker, chunk_repository, find_python_files
 
 
 def test_chunk_simple_function():
@@ -68,7 +68,88 @@ class Calculator:
             print(f"✅ Method chunk: {m.id}")
 
 
+def test_chunk_nested_and_decorated():
+    """Test nested functions are skipped and decorators stay with their chunk."""
+    chunker = PythonChunker()
+    
+    code = '''
+def outer():
+    def inner():
+        pass
+    return inner
+
+class Outer:
+    @property
+    def value(self):
+        return 1
+
+    class Inner:
+        def method(self):
+            pass
+
+    def after(self):
+        pass
+'''
+    
+    with tempfile.NamedTemporaryFile(suffix=".py", mode="w", delete=False) as f:
+        f.write(code)
+        f.flush()
+        
+        file_path = Path(f.name)
+        chunks = list(chunker.chunk_file(file_path, file_path.parent))
+        
+        names = [c.id.split("::")[1] for c in chunks]
+        assert names == ["outer", "Outer", "Outer.value", "Inner", "Inner.method", "Outer.after"]
+        
+        value = chunks[2]
+        assert value.code.startswith("@property")
+        assert value.start_line == 8
+
+
+def test_chunk_import_modules():
+    """Test top-level imported modules are attached to each chunk."""
+    chunker = PythonChunker()
+    
+    code = '''
+import os, sys as system
+import xml.etree.ElementTree as ET
+from typer.main import get_command
+from . import sibling
+
+def main():
+    pass
+'''
+    
+    with tempfile.NamedTemporaryFile(suffix=".py", mode="w", delete=False) as f:
+        f.write(code)
+        f.flush()
+        
+        file_path = Path(f.name)
+        chunk = next(chunker.chunk_file(file_path, file_path.parent))
+        
+        assert chunk.import_modules == {"os", "sys", "xml", "typer"}
+        assert len(chunk.imports) == 4
+
+
+def test_find_python_files_skips_ignored_dirs():
+    """Test ignored directories are pruned but similarly named files are kept."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo_path = Path(tmpdir)
+        for rel in ["app.py", "build_tools.py", "pkg/mod.py", ".venv/lib/site.py",
+                    "build/lib/app.py", "pkg.egg-info/setup.py", "notes.txt"]:
+            path = repo_path / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("")
+        
+        files = find_python_files(repo_path)
+        
+        assert [str(f.relative_to(repo_path)) for f in files] == ["app.py", "build_tools.py", "pkg/mod.py"]
+
+
 if __name__ == "__main__":
     test_chunk_simple_function()
     test_chunk_class_with_methods()
+    test_chunk_nested_and_decorated()
+    test_chunk_import_modules()
+    test_find_python_files_skips_ignored_dirs()
     print("\nAll chunker tests passed!")
\ No newline at end of file
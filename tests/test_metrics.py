@@ -0,0 +1,63 @@
+# tests/test_metrics.py
+from evaluation.retrieval.metrics import (
+    aggregate_metrics, evaluate_single_query, f1_at_k, mrr, precision_at_k, recall_at_k
+)
+
+
+def test_single_query_metrics():
+    """Test all metrics on a query with partial hits."""
+    retrieved = ["a", "x", "b", "y", "z"]
+    expected = ["a", "b", "c"]
+
+    m = evaluate_single_query(retrieved, expected, k=5)
+
+    assert m.recall_at_k == recall_at_k(retrieved, expected, 5) == 2 / 3
+    assert m.precision_at_k == precision_at_k(retrieved, expected, 5) == 2 / 5
+    assert m.mrr == mrr(retrieved, expected) == 1.0
+    assert m.f1_at_k == f1_at_k(retrieved, expected, 5)
+    assert m.hits == ["a", "b"]
+
+
+def test_no_hits():
+    """Test metrics when nothing relevant is retrieved."""
+    m = evaluate_single_query(["x", "y"], ["a"], k=5)
+
+    assert m.recall_at_k == 0.0
+    assert m.precision_at_k == 0.0
+    assert m.mrr == 0.0
+    assert m.f1_at_k == 0.0
+
+
+def test_first_hit_rank():
+    """Test MRR uses the rank of the first relevant result."""
+    m = evaluate_single_query(["x", "y", "a"], ["a"], k=3)
+
+    assert m.mrr == 1 / 3
+    assert m.recall_at_k == 1.0
+    assert mrr(["x", "y", "a"], ["a"], k=2) == 0.0
+    assert recall_at_k(["x", "y", "a"], ["a"], k=2) == 0.0
+    assert precision_at_k(["x", "y", "a"], ["a"], k=3) == 1 / 3
+
+
+def test_aggregate_metrics():
+    """Test averaging metrics across queries."""
+    metrics = [
+        evaluate_single_query(["a", "x"], ["a"], k=2),
+        evaluate_single_query(["x", "y"], ["a"], k=2),
+    ]
+
+    agg = aggregate_metrics(metrics)
+
+    assert agg["avg_recall_at_k"] == 0.5
+    assert agg["avg_precision_at_k"] == 0.25
+    assert agg["avg_mrr"] == 0.5
+    assert agg["num_queries"] == 2
+    assert agg["k"] == 2
+
+
+if __name__ == "__main__":
+    test_single_query_metrics()
+    test_no_hits()
+    test_first_hit_rank()
+    test_aggregate_metrics()
+    print("\nAll metrics tests passed!")
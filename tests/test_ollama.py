@@ -1,4 +1,9 @@
-from codecompass.llm.ollama import generate, embed
+import asyncio
+
+import numpy as np
+
+from codecompass.config import settings
+from codecompass.llm.ollama import batch_texts, embed, embed_batch, generate, generate_batch
 
 def test_generate_hello():
     response = generate("Say hello")
@@ -6,4 +11,69 @@ def test_generate_hello():
 
 def test_embed_length():
     vec = embed("Hello world")
-    assert len(vec) == 768
\ No newline at end of file
+    assert len(vec) == 768
+
+def test_batch_texts_caps_batches():
+    texts = [f"text {i}" for i in range(settings.embed_batch_size * 2 + 1)]
+    batches = list(batch_texts(texts))
+    assert [len(b) for b in batches] == [settings.embed_batch_size, settings.embed_batch_size, 1]
+    assert [t for b in batches for t in b] == texts
+
+class _RecordingAsyncClient:
+    """Stand-in for ollama.AsyncClient: replies out of order and records each request"""
+    requests = []
+
+    async def chat(self, **request):
+        self.requests.append(request)
+        prompt = request["messages"][-1]["content"]
+        await asyncio.sleep(0.01 * (3 - int(prompt[-1])))  # later prompts finish first
+        return {"message": {"content": f"reply to {prompt}"}}
+
+def test_generate_batch_order_limits_and_cache(monkeypatch):
+    import codecompass.llm.ollama as llm
+    monkeypatch.setattr(llm.ollama, "AsyncClient", _RecordingAsyncClient)
+    _RecordingAsyncClient.requests = []
+
+    prompts = ["batch prompt 0", "batch prompt 1", "batch prompt 2"]
+    limits = [{"num_predict": 128}, {"num_predict": 48, "stop": ["\n\n"]}, {}]
+    replies = generate_batch(prompts, limits=limits)
+
+    assert replies == [f"reply to {p}" for p in prompts]
+    options = {r["messages"][-1]["content"]: r["options"] for r in _RecordingAsyncClient.requests}
+    assert options["batch prompt 0"] == {"temperature": 0.0, "num_predict": 128}
+    assert options["batch prompt 1"] == {"temperature": 0.0, "num_predict": 48, "stop": ["\n\n"]}
+    assert options["batch prompt 2"] == {"temperature": 0.0}
+
+    # Greedy replies come back from the cache without another request
+    _RecordingAsyncClient.requests = []
+    assert generate_batch(prompts, limits=limits) == replies
+    assert _RecordingAsyncClient.requests == []
+
+def test_embed_uses_the_model_dimension(monkeypatch):
+    import codecompass.llm.ollama as llm
+
+    def fake_embed(model=None, input=(), keep_alive=None):
+        return {"embeddings": [[float(len(text))] + [1.0] * 1023 for text in input]}
+
+    monkeypatch.setattr(llm.ollama, "embed", fake_embed)
+    monkeypatch.setattr(settings, "embedding_model", "fake-1024-dim")
+
+    vectors = embed_batch(["a", "bb", "a"])
+    assert vectors.shape == (3, 1024)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    assert np.array_equal(vectors[0], vectors[2])
+    assert embed("ccc").shape == (1024,)
+    assert embed_batch([]).shape == (0, settings.embedding_dimensions)
+
+def test_warm_in_background_logs_failures(monkeypatch, caplog):
+    import codecompass.llm.ollama as llm
+
+    def refuse(**kwargs):
+        raise ConnectionError("ollama is down")
+
+    monkeypatch.setattr(llm.ollama, "chat", refuse)
+    with caplog.at_level("DEBUG", logger=llm.__name__):
+        llm.warm_in_background().join()
+
+    assert "Warming the Ollama models failed" in caplog.text
+    assert "ollama is down" in caplog.text
@@ -0,0 +1,112 @@
+# tests/test_search.py
+from pathlib import Path
+import threading
+import time
+
+import codecompass.retrieval.search as search
+from codecompass.retrieval.search import (
+    LLM_VARIANTS, _ollama_parallel, _query_keywords, evaluate_all, run_all_variants,
+    smart_expansion_search,
+)
+
+REPO = Path("repo")
+
+
+def test_run_all_variants_keeps_variant_order(monkeypatch):
+    """Test each LLM reply feeds the search query of its own variant."""
+    monkeypatch.setattr(search, "_imports_str", lambda repo_path, n: "lancedb, ollama")
+    batches = []
+
+    def fake_generate_batch(prompts, system=None, temperature=0.0, limits=None):
+        batches.append((prompts, limits))
+        return [f"reply {i}" for i in range(len(prompts))]
+
+    def fake_search_code(repo_path, query=None, limit=5, *, queries=None):
+        return [[expanded] for expanded in queries]
+
+    monkeypatch.setattr(search, "generate_batch", fake_generate_batch)
+    monkeypatch.setattr(search, "search_code", fake_search_code)
+
+    results = run_all_variants(REPO, "find the vector store", limit=3)
+
+    assert list(results) == list(LLM_VARIANTS)
+    (prompts, limits), = batches
+    for i, (name, (build_prompt, to_query, variant_limits)) in enumerate(LLM_VARIANTS.items()):
+        assert prompts[i] == build_prompt(REPO, "find the vector store")
+        assert limits[i] == variant_limits
+        assert results[name] == [to_query("find the vector store", f"reply {i}")]
+
+
+def test_evaluate_all_runs_every_variant(monkeypatch):
+    """Test variants run concurrently and come back in VARIANTS order."""
+    threads = set()
+
+    def variant(name, delay):
+        def run(repo_path, query, limit):
+            threads.add(threading.get_ident())
+            time.sleep(delay)
+            return [f"{name}: {query} ({limit})"]
+        return run
+
+    monkeypatch.setattr(search, "VARIANTS", {
+        "slow": variant("slow", 0.05), "medium": variant("medium", 0.02), "fast": variant("fast", 0),
+    })
+    monkeypatch.delenv("OLLAMA_NUM_PARALLEL", raising=False)
+
+    results = evaluate_all(REPO, "query", limit=2)
+
+    assert results == {
+        "slow": ["slow: query (2)"], "medium": ["medium: query (2)"], "fast": ["fast: query (2)"],
+    }
+    assert len(threads) > 1
+
+
+def test_ollama_parallel_parsing(monkeypatch):
+    """Test a missing, empty or invalid OLLAMA_NUM_PARALLEL falls back to one slot per variant."""
+    for value in ("", "abc", "0", "-2"):
+        monkeypatch.setenv("OLLAMA_NUM_PARALLEL", value)
+        assert _ollama_parallel() == len(search.VARIANTS)
+    monkeypatch.setenv("OLLAMA_NUM_PARALLEL", "2")
+    assert _ollama_parallel() == 2
+    monkeypatch.delenv("OLLAMA_NUM_PARALLEL")
+    assert _ollama_parallel() == len(search.VARIANTS)
+
+
+def test_smart_expansion_skips_llm_with_enough_matches(monkeypatch):
+    """Test three rule-based matches search directly; fewer fall back to v3's LLM expansion."""
+    searches, fallbacks = [], []
+
+    def no_llm(*args, **kwargs):
+        raise AssertionError("LLM called")
+
+    def fake_search_code(repo_path, query, limit):
+        searches.append(query)
+        return [query]
+
+    def fake_v3(repo_path, query, limit):
+        fallbacks.append(query)
+        return ["v3"]
+
+    monkeypatch.setattr(search, "generate", no_llm)
+    monkeypatch.setattr(search, "search_code", fake_search_code)
+    monkeypatch.setattr(search, "query_expansion_context_v3", fake_v3)
+
+    monkeypatch.setattr(search, "_matched_imports", lambda repo_path, query: ["lancedb", "ollama", "typer"])
+    results = smart_expansion_search(REPO, "embed the index", limit=3)
+    assert results == ["embed the index lancedb ollama typer"]
+    assert fallbacks == []
+
+    monkeypatch.setattr(search, "_matched_imports", lambda repo_path, query: ["lancedb", "ollama"])
+    assert smart_expansion_search(REPO, "embed the index", limit=3) == ["v3"]
+    assert fallbacks == ["embed the index"]
+    assert searches == ["embed the index lancedb ollama typer"]
+
+
+def test_query_keywords_match_word_prefixes():
+    """Test keywords match plurals and CamelCase parts but not the middle of words."""
+    assert _query_keywords("how are embeddings computed") == ["embed"]
+    assert _query_keywords("split files into chunks") == ["chunk"]
+    assert _query_keywords("CodeStore") == ["store"]
+    assert _query_keywords("PythonChunker and CodeChunk") == ["chunk"]
+    assert _query_keywords("files reindexed on change") == []
+    assert _query_keywords("vector database storage") == ["vector"]  # no "rag" inside storage
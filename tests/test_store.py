@@ -2,7 +2,11 @@
 import tempfile
 from pathlib import Path
 from codecompass.indexing.chunker import CodeChunk
-from codecompass.indexing.store import CodeStore, index_repository
+import numpy as np
+from codecompass.config import settings
+from codecompass.indexing.store import CodeStore, _quantize_rows, index_repository
+from codecompass.llm.ollama import embed
+from codecompass.retrieval.search import search_code
 
 
 def test_index_and_search():
@@ -60,8 +64,94 @@ class UserService:
         
         assert any("create_user" in r["name"] or "UserService" in r["name"] for r in results)
         
+        # Batched queries match one-at-a-time searches
+        batched = store.search_many(["user authentication login", "create new user account"], limit=3)
+        assert batched[1].to_pylist() == results
+
+        # search_code builds SearchResults from the same rows
+        search_results = search_code(repo_path, "create new user account", limit=3)
+        assert [r.id for r in search_results] == [r["id"] for r in results]
+        assert search_results[0].docstring == results[0]["docstring"]
+
+        # Small tables are searched exactly in memory; the top hit matches LanceDB's own hybrid search
+        query_vector = embed("user authentication login")
+        exact = store._exact_search("user authentication login", query_vector, limit=1)
+        indexed = store._index_search("user authentication login", query_vector, limit=1)
+        assert exact.column("name").to_pylist() == indexed.column("name").to_pylist()
+        
         print("\n✅ Store tests passed!")
 
 
+def test_incremental_reindex():
+    """Test re-indexing only picks up changed and removed files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo_path = Path(tmpdir)
+        (repo_path / "a.py").write_text("def alpha():\n    return 1\n")
+        (repo_path / "b.py").write_text("def beta():\n    return 2\n")
+        
+        assert index_repository(repo_path) == 2
+        
+        (repo_path / "a.py").write_text("def alpha():\n    return 1\n\ndef gamma():\n    return 3\n")
+        (repo_path / "b.py").unlink()
+        
+        assert index_repository(repo_path) == 2
+        
+        store = CodeStore(repo_path)
+        ids = store.table.to_arrow().column("id").to_pylist()
+        assert sorted(ids) == ["a.py::alpha", "a.py::gamma"]
+        assert set(store.load_manifest()) == {"a.py"}
+        
+        # Module-level edits leave every chunk as it was: the table isn't rewritten
+        version = store.table.version
+        (repo_path / "a.py").write_text((repo_path / "a.py").read_text() + "\nDEBUG = False\n")
+        assert index_repository(repo_path) == 2
+        assert CodeStore(repo_path).table.version == version
+
+        # Switching embedding models rebuilds the table even though no file changed
+        model = settings.embedding_model
+        settings.embedding_model = "other-embed-model"
+        try:
+            assert index_repository(repo_path) == 2
+            store = CodeStore(repo_path)
+            assert store.table.version != version
+            assert store.get_stats()["embedding_model"] == "other-embed-model"
+        finally:
+            settings.embedding_model = model
+
+
+
+def test_int8_quantized_ranking():
+    """Test per-row int8 codes rank vectors like the float32 originals."""
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((1000, 768)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    query = matrix[42] + 0.5 * rng.standard_normal(768).astype(np.float32)
+
+    codes, scales = _quantize_rows(matrix)
+    assert codes.dtype == np.int8
+    assert np.abs(codes * scales[:, None] - matrix).max() <= scales.max() / 2 + 1e-6
+
+    query_codes, _ = _quantize_rows(query[None, :])
+    scores = (codes.astype(np.int32) @ query_codes[0].astype(np.int32)) * scales
+    assert set(np.argsort(-scores)[:5]) == set(np.argsort(-(matrix @ query))[:5])
+
+
+def test_search_empty_index():
+    """Test searching an index whose files were all removed returns nothing."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo_path = Path(tmpdir)
+        (repo_path / "a.py").write_text("def alpha():\n    return 1\n")
+        assert index_repository(repo_path) == 1
+
+        (repo_path / "a.py").unlink()
+        assert index_repository(repo_path) == 0
+
+        assert CodeStore(repo_path).search("alpha", limit=3) == []
+        assert search_code(repo_path, "alpha", limit=3) == []
+
+
 if __name__ == "__main__":
-    test_index_and_search()
\ No newline at end of file
+    test_index_and_search()
+    test_incremental_reindex()
+    test_int8_quantized_ranking()
+    test_search_empty_index()
\ No newline at end of file